@@ -7,6 +7,7 @@ from router.ToolExecutor import safe_json_parse
 import json
 import sys
 import re
+import asyncio
 from dotenv import load_dotenv
 load_dotenv()
 
@@ -40,7 +41,7 @@ class MetadataExtractor:
 
         raise ValueError("No valid JSON object found in LLM response.")
 
-    def extract_metadata(self, query: str, state: ConversationState | None = None) -> Metadata:
+    async def extract_metadata(self, query: str, state: ConversationState | None = None) -> Metadata:
         try:
             logger.info(f"Extracting metadata from query: {query}")
 
@@ -96,7 +97,7 @@ Use this context if the current query is ambiguous or a follow-up.
                 - Be concise, factual, and avoid hallucinations.
             """.strip()
 
-            raw_output = self.llm_client.run_chat(system_prompt, contextual_query)
+            raw_output = await self.llm_client.arun_chat(system_prompt, contextual_query)
             logger.info(f"Raw output from LLM:\n{raw_output}")
 
             # 1) Try to extract an embedded JSON object from mixed prose.
@@ -142,7 +143,8 @@ Use this context if the current query is ambiguous or a follow-up.
                     "country": "India"
                 }
             else:
-                normalized_loc = self.location_normalizer.normalize(raw_loc)
+                # Nominatim lookup is blocking (and rate-limit sleeps), keep it off the event loop
+                normalized_loc = await asyncio.to_thread(self.location_normalizer.normalize, raw_loc)
 
             metadata = Metadata(
                 query=query,
@@ -5,25 +5,30 @@ intent_pipeline.py - Combines metadata extraction and tool mapping into a single
 import sys
 from Logging.logger import logger
 from Exception.exception import UdayamitraException
-from utility.model import Metadata, ConversationState
+from typing import Dict, Optional
+from utility.model import Metadata, ConversationState, ToolRegistryEntry
 from .extractor import MetadataExtractor
 from .tool_mapper import ToolMapper
 
 class IntentPipeline:
-    def __init__(self, model: str = "meta-llama/llama-4-maverick-17b-128e-instruct"):
+    def __init__(
+        self,
+        model: str = "meta-llama/llama-4-maverick-17b-128e-instruct",
+        tool_registry: Optional[Dict[str, ToolRegistryEntry]] = None,
+    ):
         try:
             logger.info(f"Initializing IntentPipeline")
             self.extractor = MetadataExtractor(model=model)
-            self.tool_mapper = ToolMapper()
+            self.tool_mapper = ToolMapper(tool_registry=tool_registry)
         except Exception as e:
             logger.error(f"Failed to initialize IntentPipeline: {e}")
             raise UdayamitraException("Failed to initialize IntentPipeline", sys)
 
-    def run(self, query: str, state: ConversationState | None = None) -> Metadata:
+    async def run(self, query: str, state: ConversationState | None = None) -> Metadata:
         try:
             logger.info(f"Running IntentPipeline for query: {query}")
-            metadata = self.extractor.extract_metadata(query, state)
-            enriched_metadata = self.tool_mapper.map_tools(metadata)
+            metadata = await self.extractor.extract_metadata(query, state)
+            enriched_metadata = await self.tool_mapper.map_tools(metadata)
             return enriched_metadata
         except Exception as e:
             logger.error(f"Error running IntentPipeline: {e}")
@@ -2,6 +2,7 @@
 test.py - Unit test for IntentPipeline abstraction
 '''
 
+import asyncio
 from Meta.pipeline import IntentPipeline
 from utility.model import Metadata
 
@@ -10,7 +11,7 @@ def test_pipeline():
     #query = "Does Middle East import capacitors from India?"
     query = "Which are the Top Countries Importing Capacitors from India?"
 
-    metadata: Metadata = pipeline.run(query)
+    metadata: Metadata = asyncio.run(pipeline.run(query))
     print(metadata)
     print("\n--- Metadata Extracted ---")
     print(f"Query: {metadata.query}")
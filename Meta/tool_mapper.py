@@ -1,50 +1,86 @@
 from utility.model import Metadata, ToolRegistryEntry
-from utility.register_tools import load_registry_from_file
+from utility.register_tools import load_registry_from_file, arefresh_tool_embeddings
 from Logging.logger import logger
 from Exception.exception import UdayamitraException
-from typing import Dict
+from typing import Dict, List, Optional
 import sys
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
 from utility.Embedder import HFAPIEmbeddings
 import asyncio
 import nest_asyncio
 nest_asyncio.apply()
 
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize each row so cosine similarity becomes a plain dot product."""
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
 class ToolMapper:
-    def __init__(self, description_weight: float = 0.7, intent_weight: float = 0.3):
+    def __init__(
+        self,
+        description_weight: float = 0.7,
+        intent_weight: float = 0.3,
+        tool_registry: Optional[Dict[str, ToolRegistryEntry]] = None,
+        score_threshold: Optional[float] = None,
+    ):
         """
         Initializes the ToolMapper and precomputes embeddings for all tools using HF API.
+        An already loaded `tool_registry` can be passed in to avoid re-reading the registry file.
+        Tools scoring below `score_threshold` are never selected.
         """
         try:
             logger.info("Initializing ToolMapper")
-            self.tool_registry: Dict[str, ToolRegistryEntry] = load_registry_from_file()
+            self.tool_registry: Dict[str, ToolRegistryEntry] = tool_registry if tool_registry is not None else load_registry_from_file()
             self.description_weight = description_weight
             self.intent_weight = intent_weight
+            self.score_threshold = score_threshold
 
             # Use HF API embeddings instead of local model
             self.embedding_model = HFAPIEmbeddings()
 
-            # Precompute embeddings for tool descriptions and intents
-            self.tool_embeddings: Dict[str, Dict[str, np.ndarray]] = {}
+            # Tool vectors are precomputed at registration time; only new or edited tools get embedded here
             loop = asyncio.get_event_loop()
-            for tool_name, entry in self.tool_registry.items():
-                desc_emb, intent_emb = loop.run_until_complete(
-                    asyncio.gather(
-                        self.embedding_model.embed_documents([entry.description]),
-                        self.embedding_model.embed_documents([" ".join(entry.intents)])
-                    )
-                )
-                self.tool_embeddings[tool_name] = {
-                    "description": np.array(desc_emb[0]),
-                    "intents": np.array(intent_emb[0])
-                }
+            stored = loop.run_until_complete(arefresh_tool_embeddings(self.tool_registry))
+
+            # Stacked, pre-normalized (num_tools x D) matrices; row i belongs to tool_names[i]
+            self.tool_names: List[str] = list(stored.keys())
+            if self.tool_names:
+                vectors = np.stack([stored[name] for name in self.tool_names]).astype(np.float32)
+                self.description_matrix = _normalize_rows(vectors[:, 0, :])
+                self.intent_matrix = _normalize_rows(vectors[:, 1, :])
+            else:
+                self.description_matrix = np.empty((0, 0), dtype=np.float32)
+                self.intent_matrix = np.empty((0, 0), dtype=np.float32)
 
         except Exception as e:
             logger.error(f"Failed to initialize ToolMapper: {e}")
             raise UdayamitraException("Failed to initialize ToolMapper", sys)
 
-    def map_tools(self, metadata: Metadata, top_k: int = 1) -> Metadata:
+    def score_tools(self, query_emb: np.ndarray, intents_emb: np.ndarray) -> np.ndarray:
+        """
+        Weighted cosine scores of every tool. Accepts single vectors (D,) or batches (B x D)
+        and returns (num_tools,) or (B x num_tools) respectively.
+        """
+        query_emb = _normalize_rows(np.asarray(query_emb, dtype=np.float32))
+        intents_emb = _normalize_rows(np.asarray(intents_emb, dtype=np.float32))
+        return (
+            self.description_weight * (query_emb @ self.description_matrix.T)
+            + self.intent_weight * (intents_emb @ self.intent_matrix.T)
+        )
+
+    def _select_top_k(self, scores: np.ndarray, top_k: int, score_threshold: Optional[float]) -> List[str]:
+        if top_k <= 0 or scores.size == 0:
+            return []
+        k = min(top_k, scores.size)
+        top_idx = np.argpartition(-scores, k - 1)[:k]
+        top_idx = top_idx[np.argsort(-scores[top_idx])]
+        if score_threshold is not None:
+            top_idx = top_idx[scores[top_idx] >= score_threshold]
+        return [self.tool_names[i] for i in top_idx]
+
+    async def map_tools(self, metadata: Metadata, top_k: int = 1, score_threshold: Optional[float] = None) -> Metadata:
         """
         Maps the metadata to the most relevant tools based on semantic similarity.
         Returns updated metadata with `tools_required` populated.
@@ -54,35 +90,45 @@ class ToolMapper:
                 logger.warning("No intents or expanded query found in metadata; skipping tool mapping.")
                 return metadata
 
-            # Embed query and intents using HF API (synchronously via async wrapper)
-            loop = asyncio.get_event_loop()
-            query_emb, intents_emb = loop.run_until_complete(
-                asyncio.gather(
-                    self.embedding_model.embed_documents([metadata.query]),
-                    self.embedding_model.embed_documents([" ".join(metadata.intents)])
-                )
+            # Embed query and intents using HF API
+            query_emb, intents_emb = await asyncio.gather(
+                self.embedding_model.embed_documents([metadata.query]),
+                self.embedding_model.embed_documents([" ".join(metadata.intents)])
             )
-            query_emb = np.array(query_emb[0])
-            intents_emb = np.array(intents_emb[0])
-
-            tool_scores = {}
-
-            for tool_name, embeddings in self.tool_embeddings.items():
-                # Compute cosine similarity
-                desc_sim = cosine_similarity(query_emb.reshape(1, -1), embeddings["description"].reshape(1, -1))[0][0]
-                intent_sim = cosine_similarity(intents_emb.reshape(1, -1), embeddings["intents"].reshape(1, -1))[0][0]
 
-                # Weighted combination
-                score = self.description_weight * desc_sim + self.intent_weight * intent_sim
-                tool_scores[tool_name] = score
-
-            # Pick top_k tools
-            sorted_tools = sorted(tool_scores.items(), key=lambda x: x[1], reverse=True)
-            metadata.tools_required = [tool for tool, _ in sorted_tools[:top_k]]
+            scores = self.score_tools(np.array(query_emb[0]), np.array(intents_emb[0]))
+            threshold = score_threshold if score_threshold is not None else self.score_threshold
+            metadata.tools_required = self._select_top_k(scores, top_k, threshold)
 
             logger.info(f"Tools mapped for query '{metadata.query}': {metadata.tools_required}")
             return metadata
 
         except Exception as e:
             logger.error(f"Error mapping tools with semantic similarity: {e}")
-            raise UdayamitraException("Failed to map tools", sys)
\ No newline at end of file
+            raise UdayamitraException("Failed to map tools", sys)
+
+    async def map_tools_batch(self, metadata_list: List[Metadata], top_k: int = 1, score_threshold: Optional[float] = None) -> List[Metadata]:
+        """
+        Offline variant of `map_tools`: embeds all queries in one go and scores them
+        with a single matrix product.
+        """
+        try:
+            if not metadata_list:
+                return metadata_list
+
+            query_embs, intents_embs = await asyncio.gather(
+                self.embedding_model.embed_documents([m.query for m in metadata_list]),
+                self.embedding_model.embed_documents([" ".join(m.intents) for m in metadata_list])
+            )
+
+            scores = self.score_tools(np.array(query_embs), np.array(intents_embs))
+            threshold = score_threshold if score_threshold is not None else self.score_threshold
+            for metadata, row in zip(metadata_list, scores):
+                metadata.tools_required = self._select_top_k(row, top_k, threshold)
+
+            logger.info(f"Mapped tools for {len(metadata_list)} queries in batch.")
+            return metadata_list
+
+        except Exception as e:
+            logger.error(f"Error batch-mapping tools with semantic similarity: {e}")
+            raise UdayamitraException("Failed to map tools", sys)
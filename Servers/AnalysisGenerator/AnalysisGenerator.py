@@ -5,7 +5,7 @@ import re
 import asyncio
 from dotenv import load_dotenv
 from typing import List, Dict, Any, Optional
-from fastmcp import Client
+from Servers.dispatch import call_tool
 from astrapy import DataAPIClient
 from collections import defaultdict
 
@@ -21,6 +21,9 @@ load_dotenv()
 RETRIEVER_URL = "http://127.0.0.1:10000/retrieve-scheme/mcp"
 RETRIEVER_TOOL_NAME = "retrieve_documents"
 
+# The table/direct classification of a query never changes
+INTENT_CACHE_TTL = 24 * 60 * 60
+
 
 class AnalysisGenerator:
     JSON_FORMAT_INSTRUCTIONS = """
@@ -62,7 +65,7 @@ class AnalysisGenerator:
             logger.error(f"Failed to initialize AnalysisGenerator: {e}")
             raise UdayamitraException(e, sys)
 
-    def _classify_query_intent(self, user_query: str) -> str:
+    async def _classify_query_intent(self, user_query: str) -> str:
         # (This function remains unchanged)
         system_prompt = """
         You are a query analysis expert. Your task is to determine if a user's question requires a detailed table of data to be answered effectively, or if a simple, direct textual answer is sufficient.
@@ -89,14 +92,20 @@ class AnalysisGenerator:
         Now, classify the original query.
         """
         try:
-            response = self.llm_client.run_json(system_prompt, user_prompt)
-            intent = response.get("intent", "table_required")
-            if intent not in ["table_required", "direct_answer"]:
-                return "table_required"
-            return intent
+            # Only a recognised intent is cached; anything else falls back without being stored
+            return await self.llm_client.arun_json(
+                system_prompt, user_prompt, cache_ttl=INTENT_CACHE_TTL, validate=self._validate_intent
+            )
         except Exception:
             return "table_required"
 
+    @staticmethod
+    def _validate_intent(response: Dict) -> str:
+        intent = response.get("intent")
+        if intent not in ["table_required", "direct_answer"]:
+            raise ValueError(f"Unexpected intent: {intent!r}")
+        return intent
+
     def _sanitize_llm_list_output(self, data: Any) -> List[str]:
         # (This function remains unchanged)
         if isinstance(data, list):
@@ -169,15 +178,15 @@ class AnalysisGenerator:
     async def _fetch_vector_data(self, user_query: str, top_k: int = 5) -> List[Dict[str, Any]]:
         logger.info(f"Querying retriever with: '{user_query}'")
         try:
-            async with Client(RETRIEVER_URL) as retriever_client:
-                response = await retriever_client.call_tool(
-                    RETRIEVER_TOOL_NAME,
-                    {
-                        "query": user_query,
-                        "caller_tool": "AnalysisGenerator",
-                        "top_k": top_k
-                    }
-                )
+            response = await call_tool(
+                RETRIEVER_URL,
+                RETRIEVER_TOOL_NAME,
+                {
+                    "query": user_query,
+                    "caller_tool": "AnalysisGenerator",
+                    "top_k": top_k
+                }
+            )
             docs_from_retriever = response.data.result
             if not isinstance(docs_from_retriever, list):
                 docs_from_retriever = []
@@ -215,8 +224,8 @@ class AnalysisGenerator:
     # --- ENTIRE FUNCTION REWRITTEN ---
     async def generate_structured_insight(self, user_query: str, user_profile: dict, entities: dict) -> dict:
         try:
-            # Step 1: Classify intent (this is fast, can be sync)
-            intent = self._classify_query_intent(user_query)
+            # Step 1: Classify intent
+            intent = await self._classify_query_intent(user_query)
             logger.info(f"User query classified with intent: '{intent}'")
 
             # Step 2: Fetch data in parallel
@@ -329,7 +338,7 @@ class AnalysisGenerator:
             # Step 6: Call LLM
             textual_response = None
             try:
-                textual_response = self.llm_client.run_json(system_prompt, user_prompt)
+                textual_response = await self.llm_client.arun_json(system_prompt, user_prompt)
             except Exception as llm_error:
                 logger.warning(f"LLM failed: {llm_error}")
                 textual_response = None
@@ -1,19 +1,27 @@
 import os
 import sys
 import argparse
+import asyncio
 from mcp.server.fastmcp import FastMCP
 from dotenv import load_dotenv
-from typing import Optional
 from .AnalysisGenerator import AnalysisGenerator
 from Logging.logger import logger
 from Exception.exception import UdayamitraException
 from utility.model import UserProfile
 from utility.register_tools import generate_tool_registry_entry, register_tool
+from Servers.components import shared
 
 load_dotenv()
 
 mcp = FastMCP("AnalysisGenerator", stateless_http=True)
 
+get_analysis_generator = shared(AnalysisGenerator)
+
+
+async def warmup():
+    # Also opens the Astra connection used for the structured trade data
+    await asyncio.to_thread(get_analysis_generator().structured_collection.find_one, {})
+
 @mcp.tool()
 async def generate_analysis(schema_dict: dict) -> dict:
     """
@@ -23,7 +31,7 @@ async def generate_analysis(schema_dict: dict) -> dict:
     try:
         logger.info(f"[AnalysisGenerator] Received request: {schema_dict}")
         
-        analysis_generator = AnalysisGenerator()
+        analysis_generator = get_analysis_generator()
 
         user_query = schema_dict.get("user_query", "Provide a general analysis of the export data.")
         user_profile_data = schema_dict.get("user_profile", {})
@@ -102,7 +102,7 @@ class Analyzer:
             
             textual_response = None
             try:
-                textual_response = self.llm_client.run_json(system_prompt, user_prompt)
+                textual_response = await self.llm_client.arun_json(system_prompt, user_prompt)
             except Exception as llm_error:
                 logger.warning(f"LLM failed: {llm_error}")
                 textual_response = None 
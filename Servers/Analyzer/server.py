@@ -5,14 +5,22 @@ from .Analyzer import Analyzer
 from Logging.logger import logger
 from Exception.exception import UdayamitraException
 from utility.register_tools import generate_tool_registry_entry, register_tool
-from fastmcp import Client
+from Servers.dispatch import call_tool
 from typing import List, Optional
 from dotenv import load_dotenv
 from utility.model import UserProfile
+from Servers.components import shared
 
 load_dotenv()
 
 mcp = FastMCP("Analyzer", stateless_http=True) 
+
+get_analyzer = shared(Analyzer)
+
+
+async def warmup():
+    get_analyzer()
+
 RETRIEVER_URL = "http://127.0.0.1:10000/retrieve-data/mcp"
 RETRIEVER_TOOL_NAME = "retrieve_documents"
 
@@ -20,21 +28,21 @@ RETRIEVER_TOOL_NAME = "retrieve_documents"
 async def generate_analysis(schema_dict: dict, documents: Optional[str] = None) -> dict: 
     try:
         logger.info(f"[Analyzer] Received request: {schema_dict}")  
-        analysis_generator = Analyzer() 
+        analysis_generator = get_analyzer()
         user_profile_obj = UserProfile(**schema_dict.get("user_profile", {}))
 
         query_text = schema_dict.get("user_query", "")
         logger.info(f"Querying retriever with: '{query_text}'")
         
-        async with Client(RETRIEVER_URL) as retriever_client:
-            response = await retriever_client.call_tool(
-                RETRIEVER_TOOL_NAME,
-                {
-                    "query": query_text,
-                    "caller_tool": mcp.name,
-                    "top_k": 5
-                }
-            )
+        response = await call_tool(
+            RETRIEVER_URL,
+            RETRIEVER_TOOL_NAME,
+            {
+                "query": query_text,
+                "caller_tool": mcp.name,
+                "top_k": 5
+            }
+        )
 
         docs_from_retriever = response.data.result
         if not isinstance(docs_from_retriever, list):
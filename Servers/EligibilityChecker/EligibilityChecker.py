@@ -22,7 +22,7 @@ class EligibilityChecker:
             logger.error(f"Failed to initialize EligibilityChecker: {e}")
             raise UdayamitraException("Failed to initialize EligibilityChecker", sys)
 
-    def check_eligibility(self, request: EligibilityCheckRequest, retrieved_documents: str = None) -> dict:
+    async def check_eligibility(self, request: EligibilityCheckRequest, retrieved_documents: str = None) -> dict:
         """
         Returns:
             - If complete: dict of `EligibilityCheckResponse`
@@ -91,7 +91,7 @@ class EligibilityChecker:
             Return exactly one JSON object. No preamble. No code fences. No trailing commentary.
             """
 
-            raw_response = self.llm_client.run_json(system_prompt, user_prompt)
+            raw_response = await self.llm_client.arun_json(system_prompt, user_prompt)
             eligibility = EligibilityCheckResponse(**raw_response)
 
             response = {
@@ -99,7 +99,7 @@ class EligibilityChecker:
             }
 
             if eligibility.eligible is None and eligibility.missing_fields:
-                follow_ups = self.question_generator.generate_questions(
+                follow_ups = await self.question_generator.generate_questions(
                     missing_fields=eligibility.missing_fields,
                     scheme_name=eligibility.scheme_name
                 )
@@ -4,7 +4,7 @@ from ...EligibilityChecker import EligibilityChecker
 checker = EligibilityChecker()
 
 async def check_eligibility_node(state: EligibilityState) -> EligibilityState:
-    result = checker.check_eligibility(
+    result = await checker.check_eligibility(
         request=state.to_request(),
         retrieved_documents=state.retrieved_documents
     )
@@ -9,7 +9,7 @@ async def generate_question_node(state: EligibilityState) -> EligibilityState:
         state.follow_up_questions = []
         return state
 
-    questions = question_generator.generate_questions(
+    questions = await question_generator.generate_questions(
         missing_fields=state.missing_fields,
         scheme_name=state.scheme_name
     )
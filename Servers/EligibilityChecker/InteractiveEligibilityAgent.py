@@ -15,7 +15,7 @@ class InteractiveEligibilityAgent:
         self.scheme_name = None
         self.retrieved_documents = None
 
-    def start(self, request: EligibilityCheckRequest, retrieved_documents: str = None):
+    async def start(self, request: EligibilityCheckRequest, retrieved_documents: str = None):
         """
         Kicks off the interactive eligibility check.
         Stores the initial request and prepares follow-up questions.
@@ -24,7 +24,7 @@ class InteractiveEligibilityAgent:
         self.scheme_name = request.scheme_name
         self.retrieved_documents = retrieved_documents
 
-        result = self.checker.check_eligibility(request, retrieved_documents)
+        result = await self.checker.check_eligibility(request, retrieved_documents)
 
         # If already eligible or ineligible
         if "follow_up_questions" not in result or not result.get("follow_up_questions"):
@@ -57,7 +57,7 @@ class InteractiveEligibilityAgent:
         """
         self.collected_fields[field_name] = answer
 
-    def finalize(self):
+    async def finalize(self):
         """
         Builds a new request with updated user profile and rechecks eligibility.
         """
@@ -75,7 +75,7 @@ class InteractiveEligibilityAgent:
             detected_intents=self.prev_request.detected_intents,
         )
 
-        final_result = self.checker.check_eligibility(new_request, self.retrieved_documents)
+        final_result = await self.checker.check_eligibility(new_request, self.retrieved_documents)
 
         return {
             "done": True,
@@ -4,7 +4,7 @@ class QuestionGenerator:
     def __init__(self, model: str = "meta-llama/llama-4-maverick-17b-128e-instruct"):
         self.llm = LLMClient(model=model)
 
-    def generate_questions(self, missing_fields: list[str], scheme_name: str = None) -> list[str]:
+    async def generate_questions(self, missing_fields: list[str], scheme_name: str = None) -> list[str]:
         prompt = f"""
         You are an assistant that generates follow-up questions to collect missing information for checking eligibility in a government scheme.
         
@@ -21,6 +21,6 @@ class QuestionGenerator:
             ]
         }}
         """
-        response = self.llm.run_json("Generate follow-up questions.", prompt)
+        response = await self.llm.arun_json("Generate follow-up questions.", prompt)
         return response["questions"]
 
@@ -5,14 +5,20 @@ from Logging.logger import logger
 from Exception.exception import UdayamitraException
 from utility.register_tools import generate_tool_registry_entry, register_tool
 from utility.model import EligibilityCheckRequest
-from fastmcp import Client
-from typing import Optional
+from Servers.dispatch import call_tool
 from dotenv import load_dotenv
+from Servers.components import shared
 
 load_dotenv()
 
 mcp = FastMCP("EligibilityChecker", stateless_http=True)
 
+get_checker = shared(EligibilityChecker)
+
+
+async def warmup():
+    get_checker()
+
 RETRIEVER_URL = "http://127.0.0.1:10000/retrieve-scheme/mcp"
 RETRIEVER_TOOL_NAME = "retrieve_documents"
 
@@ -20,18 +26,18 @@ RETRIEVER_TOOL_NAME = "retrieve_documents"
 async def check_eligibility(schema_dict: dict) -> dict:
     try:
         logger.info(f"[EligibilityChecker] Received eligibility check request: {schema_dict}")
-        checker = EligibilityChecker()
+        checker = get_checker()
         request_obj = EligibilityCheckRequest(**schema_dict)
 
         query = request_obj.scheme_name.strip() or request_obj.model_dump_json()
         logger.debug(f"[EligibilityChecker] Querying retriever with: '{query}'")
 
         # Retrieve documents
-        async with Client(RETRIEVER_URL) as retriever_client:
-            response = await retriever_client.call_tool(
-                RETRIEVER_TOOL_NAME,
-                {"query": query, "caller_tool": mcp.name, "top_k": 5}
-            )
+        response = await call_tool(
+            RETRIEVER_URL,
+            RETRIEVER_TOOL_NAME,
+            {"query": query, "caller_tool": mcp.name, "top_k": 5}
+        )
 
         logger.debug(f"[EligibilityChecker] Retriever response: {response}")
         docs = response.data.result or []
@@ -41,7 +47,7 @@ async def check_eligibility(schema_dict: dict) -> dict:
         logger.info(f"[EligibilityChecker] Combined content length: {len(combined_content)}")
 
         # Run checker
-        result = checker.check_eligibility(request=request_obj, retrieved_documents=combined_content or None)
+        result = await checker.check_eligibility(request=request_obj, retrieved_documents=combined_content or None)
 
         # Return structured dict directly
         return result
@@ -59,7 +65,7 @@ async def interactive_check_eligibility(schema_dict: dict) -> dict:
         request_obj = EligibilityCheckRequest(**schema_dict)
 
         agent = InteractiveEligibilityAgent()
-        final_response = agent.rerun(prev_request=request_obj, prev_response=agent.checker.check_eligibility(request_obj))
+        final_response = agent.rerun(prev_request=request_obj, prev_response=await agent.checker.check_eligibility(request_obj))
 
         return {
     "output_text": final_response["explanation"] if isinstance(final_response, dict) and "explanation" in final_response else str(final_response),
@@ -5,7 +5,6 @@ Uses external embedding and reranker APIs to avoid loading heavy models locally.
 
 import sys
 import json
-import asyncio
 import httpx
 from Logging.logger import logger
 from Exception.exception import UdayamitraException
@@ -106,7 +105,7 @@ class InsightGenerator:
             """
 
             # Run through your LLM client
-            response_dict = await asyncio.to_thread(self.llm_client.run_json, system_prompt, user_prompt)
+            response_dict = await self.llm_client.arun_json(system_prompt, user_prompt)
 
             validated_output = InsightGeneratorOutput(**response_dict)
             return validated_output.model_dump()
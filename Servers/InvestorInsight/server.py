@@ -4,14 +4,22 @@ from .InsightGenerator import InsightGenerator
 from Logging.logger import logger
 from Exception.exception import UdayamitraException
 from utility.register_tools import generate_tool_registry_entry, register_tool
-from fastmcp import Client
+from Servers.dispatch import call_tool
 from typing import List, Optional
 from dotenv import load_dotenv
 from utility.model import UserProfile, RetrievedDoc, InsightGeneratorInput, InsightGeneratorOutput
+from Servers.components import shared
 
 load_dotenv()
 
 mcp = FastMCP("InsightGenerator", stateless_http=True)
+
+get_insight_generator = shared(InsightGenerator)
+
+
+async def warmup():
+    get_insight_generator()
+
 RETRIEVER_URL = "http://127.0.0.1:10000/retrieve-scheme/mcp"
 RETRIEVER_TOOL_NAME = "retrieve_documents"
 
@@ -19,7 +27,7 @@ RETRIEVER_TOOL_NAME = "retrieve_documents"
 async def generate_insight(schema_dict: dict, documents: Optional[str] = None) -> dict:
     try:
         logger.info(f"[InsightGenerator] Received request: {schema_dict}")
-        insight_generator = InsightGenerator()
+        insight_generator = get_insight_generator()
 
         # Reshape the input dictionary into the required Pydantic model for the user profile
         user_profile_obj = UserProfile(**schema_dict.get("user_profile", {}))
@@ -27,15 +35,15 @@ async def generate_insight(schema_dict: dict, documents: Optional[str] = None) -
         query_text = schema_dict.get("user_query", "")
         logger.info(f"Querying retriever with: '{query_text}'")
         
-        async with Client(RETRIEVER_URL) as retriever_client:
-            response = await retriever_client.call_tool(
-                RETRIEVER_TOOL_NAME,
-                {
-                    "query": query_text,
-                    "caller_tool": mcp.name,
-                    "top_k": 5
-                }
-            )
+        response = await call_tool(
+            RETRIEVER_URL,
+            RETRIEVER_TOOL_NAME,
+            {
+                "query": query_text,
+                "caller_tool": mcp.name,
+                "top_k": 5
+            }
+        )
 
         docs_from_retriever = response.data.result
         if not isinstance(docs_from_retriever, list):
@@ -51,7 +59,7 @@ async def generate_insight(schema_dict: dict, documents: Optional[str] = None) -
         # --- End of reference logic ---
 
         # Call the core logic with the reshaped data, matching the reference pattern
-        result = insight_generator.generate_insight(
+        result = await insight_generator.generate_insight(
             user_query=query_text,
             user_profile=user_profile_obj.model_dump(), # Pass as dict, like in SchemeExplainer
             retrieved_documents=combined_content or None
@@ -7,6 +7,9 @@ from Exception.exception import UdayamitraException
 from langchain_astradb import AstraDBVectorStore
 from utility.register_tools import generate_tool_registry_entry, register_tool
 from utility.model import RetrievedDoc, RetrieverOutput
+from utility.SingleFlight import get_singleflight
+from utility.VectorSearch import search_vector_store, search_collection
+from utility.LocalIndex import get_local_index, start_background_sync
 from utility.Embedder import RemoteHFEmbeddings
 
 load_dotenv()
@@ -33,8 +36,23 @@ COLLECTION_MAP = {
     "Analyzer": "Mospi_data"
 }
 
+# In-memory copies of the collections the tools query, kept in sync with Astra in the background
+local_indexes = {
+    name: get_local_index(vector_stores[name].collection_name, ASTRA_DB_ENDPOINT, ASTRA_DB_TOKEN)
+    for name in set(COLLECTION_MAP.values())
+}
+
 mcp = FastMCP("MoSPI", stateless_http=True)
 
+
+async def warmup():
+    """One throwaway search, so the embedding API and the Astra connection are up before the first query."""
+    start_background_sync()
+    await search_vector_store("Mospi_data", vector_stores["Mospi_data"], "warmup", k=1)
+
+# Concurrent identical queries against the same collection share one vector search
+retrieval_flights = get_singleflight("MoSPI.retrieve_documents")
+
 @mcp.tool()
 async def retrieve_documents(query: str, caller_tool: str, top_k: int = 5) -> RetrieverOutput:
     logger.info(f"[Retriever] Query received from '{caller_tool}' → query: '{query}' | top_k: {top_k}")
@@ -50,7 +68,11 @@ async def retrieve_documents(query: str, caller_tool: str, top_k: int = 5) -> Re
         raise UdayamitraException(f"Server error: No vector store configured for collection '{collection_name}'", sys)
 
     try:
-        docs = store.similarity_search(query=query, k=top_k)
+        async def search():
+            # Local mirror first; Astra searches run off the event loop every mounted MCP app shares
+            return await search_collection(collection_name, store, local_indexes.get(collection_name), embeddings, query, top_k)
+
+        docs = await retrieval_flights.do(f"{collection_name}\x00{top_k}\x00{query}", search)
         logger.info(f"[Retriever] Found {len(docs)} matching docs from '{collection_name}'.")
         for i, doc in enumerate(docs):
             logger.debug(f"[Retriever] Doc {i+1}: {doc.page_content[:120]!r} | Metadata: {doc.metadata}")
@@ -8,6 +8,9 @@ from Exception.exception import UdayamitraException
 from utility.LLM import LLMClient
 from utility.model import SchemeMetadata, SchemeExplanationResponse
 
+# Explanations depend only on the scheme, profile and retrieved docs, all part of the cache key
+EXPLANATION_CACHE_TTL = 6 * 60 * 60
+
 class SchemeExplainer:
     def __init__(self, model: str = "meta-llama/llama-4-maverick-17b-128e-instruct"):
         try:
@@ -18,7 +21,7 @@ class SchemeExplainer:
             logger.error(f"Failed to initialize SchemeExplainer: {e}")
             raise UdayamitraException("Failed to initialize SchemeExplainer", sys)
 
-    def explain_scheme(self, scheme_metadata: SchemeMetadata, retrieved_documents: str = None) -> SchemeExplanationResponse:
+    async def explain_scheme(self, scheme_metadata: SchemeMetadata, retrieved_documents: str = None) -> SchemeExplanationResponse:
         try:
             system_prompt = """
             ROLE
@@ -67,8 +70,13 @@ class SchemeExplainer:
             - Return only the JSON object (no extra text).
             """
 
-            raw_response = self.llm_client.run_json(system_prompt, user_prompt)
-            validated_response = SchemeExplanationResponse(**raw_response)
+            # Validated before caching, so a reply that fails the schema is not served again
+            validated_response = await self.llm_client.arun_json(
+                system_prompt,
+                user_prompt,
+                cache_ttl=EXPLANATION_CACHE_TTL,
+                validate=lambda data: SchemeExplanationResponse(**data),
+            )
             return validated_response
 
         except Exception as e:
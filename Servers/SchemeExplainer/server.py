@@ -5,14 +5,21 @@ from Logging.logger import logger
 from Exception.exception import UdayamitraException
 from utility.register_tools import generate_tool_registry_entry, register_tool
 from utility.model import SchemeMetadata
-from fastmcp import Client
+from Servers.dispatch import call_tool
 from typing import Optional
 from dotenv import load_dotenv
+from Servers.components import shared
 
 load_dotenv()
 
 mcp = FastMCP("SchemeExplainer", stateless_http=True)
 
+get_explainer = shared(SchemeExplainer)
+
+
+async def warmup():
+    get_explainer()
+
 RETRIEVER_URL = "http://127.0.0.1:10000/retrieve-scheme/mcp"
 RETRIEVER_TOOL_NAME = "retrieve_documents"
 
@@ -20,7 +27,7 @@ RETRIEVER_TOOL_NAME = "retrieve_documents"
 async def explain_scheme(schema_dict: dict, documents: Optional[str] = None) -> dict:
     try:
         logger.info(f"Received request to explain scheme: {schema_dict}")
-        scheme_explainer = SchemeExplainer()
+        scheme_explainer = get_explainer()
 
         reshaped_metadata = {
             "scheme_name": schema_dict.get("entities", {}).get("scheme_name", ""),
@@ -35,15 +42,15 @@ async def explain_scheme(schema_dict: dict, documents: Optional[str] = None) ->
         logger.info(f"[Explainer] Querying retriever with: '{query}', with type: {type(query)}")
         logger.debug(f"[Explainer] Calling retriever with query: '{query}' | Collection: 'chunks'")
 
-        async with Client(RETRIEVER_URL) as retriever_client:
-            response = await retriever_client.call_tool(
-                RETRIEVER_TOOL_NAME,
-                {
-                    "query": query["query"],
-                    "caller_tool": mcp.name,  
-                    "top_k": 5
-                }
-            )
+        response = await call_tool(
+            RETRIEVER_URL,
+            RETRIEVER_TOOL_NAME,
+            {
+                "query": query["query"],
+                "caller_tool": mcp.name,  
+                "top_k": 5
+            }
+        )
 
         logger.debug(f"[Explainer] Raw retriever response: {response}")
         logger.warning(f"[Explainer] response.data → {response.data} (type={type(response.data)})")
@@ -62,7 +69,7 @@ async def explain_scheme(schema_dict: dict, documents: Optional[str] = None) ->
         combined_content = "\n\n".join(doc.get("content", "") for doc in doc_dicts)
         logger.info(f"[Explainer] Combined content length: {len(combined_content)}")
 
-        result = scheme_explainer.explain_scheme(
+        result = await scheme_explainer.explain_scheme(
             scheme_metadata=metadata_obj,
             retrieved_documents=combined_content or None
         )
@@ -1,3 +1,4 @@
+import contextlib
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
@@ -5,15 +6,29 @@ from datetime import datetime
 import json
 import sys 
 from .pipeline import Pipeline
+from .components import get_components
 from utility.model import ConversationState, Message
 from utility.StateManager import StateManager
 from Logging.logger import logger 
 from Exception.exception import UdayamitraException 
+from utility.LLMCache import get_llm_cache
+from utility.SingleFlight import get_singleflight_stats
+from utility.RateLimiter import get_llm_scheduler
+from router.SessionPool import get_session_pool
+from utility.Embedder import get_embedding_cache, get_embedding_batcher_stats
 
 import nest_asyncio
 nest_asyncio.apply()
 
-app = FastAPI(title="Pipeline API")
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build the shared pipeline components once, before the first request arrives
+    logger.info("Warming up shared pipeline components...")
+    app.state.components = get_components()
+    yield
+    await get_session_pool().close()
+
+app = FastAPI(title="Pipeline API", lifespan=lifespan)
 
 # Allow CORS
 app.add_middleware(
@@ -53,7 +68,7 @@ async def start_pipeline(request: StartRequest):
     state_manager.add_message(role="user", content=request.user_query)
 
     try:
-        pipeline = Pipeline(request.user_query, state=state_manager.get_state())
+        pipeline = Pipeline(request.user_query, state=state_manager.get_state(), components=app.state.components)
         output = await pipeline.run()
         
         # This handles the "no tools found" case where the pipeline
@@ -93,7 +108,7 @@ async def continue_pipeline(request: ContinueRequest):
     state_manager.add_message(role="user", content=request.user_query)
 
     try:
-        pipeline = Pipeline(request.user_query, state=state_manager.get_state())
+        pipeline = Pipeline(request.user_query, state=state_manager.get_state(), components=app.state.components)
         output = await pipeline.run()
 
         # This handles the "no tools found" case
@@ -145,6 +160,22 @@ def _extract_response_from_results(output: dict) -> str:
     
     return "\n\n".join(messages)
 
+# GET /metrics
+@app.get("/metrics")
+async def get_metrics():
+    llm_cache = get_llm_cache()
+    embedding_cache = get_embedding_cache()
+    return {
+        "llm_cache": llm_cache.get_stats() if llm_cache else None,
+        "singleflight": get_singleflight_stats(),
+        "llm_scheduler": get_llm_scheduler().get_stats(),
+        "planner": app.state.components.planner.get_stats(),
+        "schema_generator": app.state.components.tool_executor.schema_generator.get_stats(),
+        "mcp_sessions": get_session_pool().get_stats(),
+        "embedding_cache": embedding_cache.get_stats() if embedding_cache else None,
+        "embedding_batcher": get_embedding_batcher_stats(),
+    }
+
 # GET /status
 @app.get("/status")
 async def get_status():
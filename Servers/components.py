@@ -0,0 +1,61 @@
+'''
+components.py - Long-lived pipeline components shared by every request.
+
+Building an IntentPipeline, Planner and ToolExecutor opens several Groq clients,
+reads the tool registry and embeds every tool description, so the backend builds
+them once at startup and hands per-request conversation state to them explicitly.
+The MCP servers build their tool engines the same way, through shared().
+'''
+
+import sys
+import threading
+from typing import Callable, Dict, TypeVar
+
+from Meta.pipeline import IntentPipeline
+from router.planner import Planner
+from router.ToolExecutor import ToolExecutor
+from utility.model import ToolRegistryEntry
+from utility.register_tools import load_registry_from_file
+from Logging.logger import logger
+from Exception.exception import UdayamitraException
+
+DEFAULT_MODEL = "meta-llama/llama-4-maverick-17b-128e-instruct"
+
+
+class PipelineComponents:
+    def __init__(self, model: str = DEFAULT_MODEL):
+        try:
+            logger.info("Building shared pipeline components...")
+            self.tool_registry: Dict[str, ToolRegistryEntry] = load_registry_from_file()
+            self.intent_pipeline = IntentPipeline(model=model, tool_registry=self.tool_registry)
+            self.planner = Planner(model=model, tool_registry=self.tool_registry)
+            self.tool_executor = ToolExecutor(tool_registry=self.tool_registry)
+            logger.info("Shared pipeline components ready.")
+        except Exception as e:
+            logger.error(f"Failed to build pipeline components: {e}")
+            raise UdayamitraException("Failed to build pipeline components", sys)
+
+
+T = TypeVar("T")
+
+
+def shared(factory: Callable[[], T]) -> Callable[[], T]:
+    """
+    Returns a getter for one process-wide `factory()` instance, built on the first call
+    (a server's warmup() makes that call before it takes traffic) and shared by every later one.
+    """
+    instance = []
+    lock = threading.Lock()
+
+    def get() -> T:
+        if not instance:
+            with lock:
+                if not instance:
+                    instance.append(factory())
+        return instance[0]
+
+    return get
+
+
+# The process-wide components, built on first use
+get_components = shared(PipelineComponents)
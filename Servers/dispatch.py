@@ -0,0 +1,101 @@
+'''
+dispatch.py - Tool calls between MCP servers.
+
+When the target server is mounted in the same process (Servers/main.py mounts
+all of them) and the URL points back at this process, the tool is called through
+FastMCP's own call_tool (which validates the arguments) instead of going through
+a loopback HTTP round-trip. Anything else is called over streamable HTTP with a
+fastmcp Client, as before.
+'''
+
+import os
+import socket
+import ipaddress
+import threading
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Any, Dict
+from urllib.parse import urlparse
+
+from fastmcp import Client
+from mcp.server.fastmcp import FastMCP
+
+from Logging.logger import logger
+
+_local_servers: Dict[str, FastMCP] = {}
+_stats = {"local": 0, "remote": 0}
+_lock = threading.Lock()
+
+# Port the combined server listens on (Servers/main.py); other ports belong to other processes
+SERVER_PORT = int(os.getenv("PORT", 10000))
+# Extra comma-separated host names that resolve to this process, e.g. its public hostname
+SELF_HOSTS = {h.strip().lower() for h in os.getenv("MCP_SELF_HOSTS", "").split(",") if h.strip()}
+
+
+@dataclass
+class LocalToolResult:
+    """Mirrors the `.data` attribute of a fastmcp CallToolResult: the structured output with attribute access."""
+    data: Any
+
+
+def register_local_server(route: str, mcp: FastMCP):
+    """Record that `mcp` is mounted at `route` (e.g. "/retrieve-scheme") in this process."""
+    with _lock:
+        _local_servers[route.rstrip("/")] = mcp
+    logger.info(f"[dispatch] {mcp.name} registered for in-process calls at {route}")
+
+
+def _is_own_address(url: str) -> bool:
+    parsed = urlparse(url)
+    host = (parsed.hostname or "").lower()
+    port = parsed.port or {"http": 80, "https": 443}.get(parsed.scheme)
+    if port != SERVER_PORT:
+        return False
+    if host in SELF_HOSTS or host in ("localhost", socket.gethostname().lower()):
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def _local_server_for(url: str):
+    if not _is_own_address(url):
+        return None
+    path = urlparse(url).path.rstrip("/")
+    with _lock:
+        for route, mcp in _local_servers.items():
+            if path == route or path.startswith(route + "/"):
+                return mcp
+    return None
+
+
+async def call_tool(url: str, tool_name: str, arguments: Dict[str, Any]):
+    """Call `tool_name` on the MCP server at `url`; the result exposes the tool's output as `.data`."""
+    mcp = _local_server_for(url)
+    if mcp is not None:
+        with _lock:
+            _stats["local"] += 1
+        result = await mcp.call_tool(tool_name, arguments)
+        # Tools with an output schema return (content, structured output); others only content
+        structured = result[1] if isinstance(result, tuple) else None
+        return LocalToolResult(data=_to_namespace(structured))
+
+    with _lock:
+        _stats["remote"] += 1
+    async with Client(url) as client:
+        return await client.call_tool(tool_name, arguments)
+
+
+def _to_namespace(value: Any) -> Any:
+    """Nested dicts become objects, like fastmcp does when it deserializes structured output."""
+    if isinstance(value, dict):
+        return SimpleNamespace(**{key: _to_namespace(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return [_to_namespace(item) for item in value]
+    return value
+
+
+def get_dispatch_stats() -> Dict[str, int]:
+    with _lock:
+        return dict(_stats)
@@ -1,5 +1,6 @@
 import os
 import sys
+import asyncio
 import contextlib
 import httpx
 import uvicorn
@@ -12,14 +13,22 @@ nest_asyncio.apply()
 
 from Logging.logger import logger
 from Exception.exception import UdayamitraException
+from utility.LLMCache import get_llm_cache
+from utility.SingleFlight import get_singleflight_stats
+from utility.RateLimiter import get_llm_scheduler
+from Servers.dispatch import register_local_server, get_dispatch_stats
+from utility.VectorSearch import get_vector_search_stats
+from utility.LocalIndex import get_local_index_stats
+from utility.LLM import warmup_llm
+from utility.Embedder import warmup_embeddings, get_embedding_cache, get_embedding_batcher_stats
 
 # Import the MCP servers
-from Servers.SchemeExplainer.server import mcp as scheme_explainer_mcp
-from Servers.EligibilityChecker.server import mcp as eligibility_checker_mcp
-from Servers.SchemeDB.server import mcp as scheme_db_retriever_mcp
-from Servers.MoSPI.server import mcp as db_retriever_mcp
-from Servers.InvestorInsight.server import mcp as investor_insight_mcp
-from Servers.Analyzer.server import mcp as analysis_generator_mcp
+from Servers.SchemeExplainer.server import mcp as scheme_explainer_mcp, warmup as scheme_explainer_warmup
+from Servers.EligibilityChecker.server import mcp as eligibility_checker_mcp, warmup as eligibility_checker_warmup
+from Servers.SchemeDB.server import mcp as scheme_db_retriever_mcp, warmup as scheme_db_retriever_warmup
+from Servers.MoSPI.server import mcp as db_retriever_mcp, warmup as db_retriever_warmup
+from Servers.InvestorInsight.server import mcp as investor_insight_mcp, warmup as investor_insight_warmup
+from Servers.Analyzer.server import mcp as analysis_generator_mcp, warmup as analysis_generator_warmup
 
 ALL_MCP_SERVERS = {
     "/explain-scheme": scheme_explainer_mcp,
@@ -30,6 +39,28 @@ ALL_MCP_SERVERS = {
     "/generate-analysis": analysis_generator_mcp,
 }
 
+WARMUPS = {
+    "groq": warmup_llm,
+    "embeddings": warmup_embeddings,
+    scheme_explainer_mcp.name: scheme_explainer_warmup,
+    eligibility_checker_mcp.name: eligibility_checker_warmup,
+    scheme_db_retriever_mcp.name: scheme_db_retriever_warmup,
+    db_retriever_mcp.name: db_retriever_warmup,
+    investor_insight_mcp.name: investor_insight_warmup,
+    analysis_generator_mcp.name: analysis_generator_warmup,
+}
+
+async def warmup_all():
+    """Build every tool engine and open the Groq, embedding and Astra connections before serving."""
+    names = list(WARMUPS)
+    outcomes = await asyncio.gather(*(WARMUPS[name]() for name in names), return_exceptions=True)
+    for name, outcome in zip(names, outcomes):
+        if isinstance(outcome, Exception):
+            # A cold dependency only slows the first request down, so keep starting up
+            logger.warning(f"Warmup of {name} failed: {outcome}")
+        else:
+            logger.info(f"Warmup of {name} done")
+
 @contextlib.asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Starting MCP server lifespan...")
@@ -38,6 +69,7 @@ async def lifespan(app: FastAPI):
             for route, mcp in ALL_MCP_SERVERS.items():
                 await stack.enter_async_context(mcp.session_manager.run())
                 logger.info(f"{mcp.name} MCP server started successfully at {route}")
+            await warmup_all()
             yield
             logger.info("Shutting down all MCP servers...")
     except Exception as e:
@@ -70,6 +102,21 @@ except Exception as e:
 async def health_check():
     return {"status": "ok"}
 
+@server.get("/metrics")
+async def metrics():
+    llm_cache = get_llm_cache()
+    embedding_cache = get_embedding_cache()
+    return {
+        "llm_cache": llm_cache.get_stats() if llm_cache else None,
+        "singleflight": get_singleflight_stats(),
+        "llm_scheduler": get_llm_scheduler().get_stats(),
+        "dispatch": get_dispatch_stats(),
+        "vector_search": get_vector_search_stats(),
+        "local_index": get_local_index_stats(),
+        "embedding_cache": embedding_cache.get_stats() if embedding_cache else None,
+        "embedding_batcher": get_embedding_batcher_stats(),
+    }
+
 @server.get("/config")
 async def config():
     return {"message": "Udayamitra MCP Server Configuration", "endpoints": list(ALL_MCP_SERVERS.keys())}
@@ -99,9 +146,10 @@ async def proxy_mcp(request: Request):
         logger.error(f"Proxying to MCP endpoint failed: {e}")
         return {"error": "Failed to proxy request"}
 
-# mounting the MCP servers
+# mounting the MCP servers; tools calling each other within this process skip the HTTP hop
 for route, mcp in ALL_MCP_SERVERS.items():
     server.mount(route, mcp.streamable_http_app())
+    register_local_server(route, mcp)
 
 if __name__ == "__main__":
     PORT = int(os.getenv("PORT", 10000))
@@ -3,12 +3,10 @@ import asyncio
 from enum import Enum, auto
 
 from utility.model import Metadata, ExecutionPlan, ConversationState
-from Meta.pipeline import IntentPipeline
-from router.planner import Planner
-from router.ToolExecutor import ToolExecutor
 from Logging.logger import logger
 from Exception.exception import UdayamitraException
 from utility.StateManager import StateManager
+from .components import PipelineComponents, get_components
 
 class PipelineStage(Enum):
     IDLE = auto()
@@ -19,8 +17,16 @@ class PipelineStage(Enum):
     ERROR = auto()
 
 class Pipeline:
-    def __init__(self, user_query: str, state: ConversationState = None, log_file: str = "pipeline_log.txt"):
+    def __init__(
+        self,
+        user_query: str,
+        state: ConversationState = None,
+        log_file: str = "pipeline_log.txt",
+        components: PipelineComponents | None = None,
+    ):
         self.user_query = user_query
+        # Shared, long-lived stages; only the query and conversation state are per request
+        self.components = components if components is not None else get_components()
         self.log_file = log_file
         self.stage = PipelineStage.IDLE
         self.status_message = "Initialized."
@@ -44,10 +50,9 @@ class Pipeline:
         logger.info(f"[{stage.name}] {message}")
         self.log(f"{stage.name}:\n{message}")
 
-    def extract_metadata(self):
+    async def extract_metadata(self):
         self.set_stage(PipelineStage.METADATA_EXTRACTION, "Extracting metadata from user query...")
-        extractor = IntentPipeline()
-        self.metadata = extractor.run(self.user_query, state=self.conversation_state)
+        self.metadata = await self.components.intent_pipeline.run(self.user_query, state=self.conversation_state)
         self.log(f"Extracted Metadata:\n{self.metadata.model_dump_json(indent=2)}")
 
         # --- State-aware topic switch detection ---
@@ -63,10 +68,9 @@ class Pipeline:
             logger.debug("[Pipeline] Detected topic switch. Resetting partial state.")
             state_manager.reset_on_topic_switch()
 
-    def plan_execution(self):
+    async def plan_execution(self):
         self.set_stage(PipelineStage.PLANNING, "Building execution plan...")
-        planner = Planner()
-        self.plan = planner.build_plan(self.metadata, state=self.conversation_state)
+        self.plan = await self.components.planner.build_plan(self.metadata, state=self.conversation_state)
         self.log(f"Execution Plan:\n{self.plan.model_dump_json(indent=2)}")
 
         # --- Update intent and scheme in state ---
@@ -81,8 +85,9 @@ class Pipeline:
     async def execute_plan(self):
         self.set_stage(PipelineStage.EXECUTION, "Running execution plan with tool executor...")
 
-        executor = ToolExecutor(conversation_state=self.conversation_state)
-        self.results = await executor.run_execution_plan(self.plan, self.metadata)
+        self.results = await self.components.tool_executor.run_execution_plan(
+            self.plan, self.metadata, conversation_state=self.conversation_state
+        )
         self.log(f"Execution Results:\n{json.dumps(self.results, indent=2)}")
 
         # --- Clear missing inputs for successful tools ---
@@ -98,8 +103,8 @@ class Pipeline:
     async def run(self):
         try:
             self.log(f"User Query:\n{self.user_query}")
-            self.extract_metadata()
-            self.plan_execution()
+            await self.extract_metadata()
+            await self.plan_execution()
             await self.execute_plan()
 
             self.set_stage(PipelineStage.COMPLETED, "Pipeline execution completed successfully.")
@@ -1,20 +1,35 @@
 import sys
 import os
+import queue
+import threading
 from typing import List, Dict, Any
 from dotenv import load_dotenv
 from Logging.logger import logger
 from Exception.exception import UdayamitraException
 from astrapy import DataAPIClient
 from astrapy.constants import VectorMetric
+from astrapy.exceptions import CollectionInsertManyException, DataAPIResponseException
 from astrapy.info import CollectionDefinition, CollectionVectorOptions
-from langchain_community.document_loaders import PyPDFLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
 from utility.Embedder import HFAPIEmbeddings
+from utility.async_utils import run_async
+from utility.IngestionManifest import IngestionManifest, chunk_id
+from utility.PDFExtraction import chunk_pdf, imap_unordered
 import asyncio
 import nest_asyncio
 nest_asyncio.apply()
 load_dotenv()
 
+# Processes parsing and chunking PDFs; each holds one whole PDF's chunks at a time
+INGEST_EXTRACT_WORKERS = int(os.getenv("INGEST_EXTRACT_WORKERS", os.cpu_count() or 1))
+INGEST_EMBED_WORKERS = int(os.getenv("INGEST_EMBED_WORKERS", 2))
+INGEST_INSERT_WORKERS = int(os.getenv("INGEST_INSERT_WORKERS", 1))
+INGEST_EMBED_BATCH_SIZE = int(os.getenv("INGEST_EMBED_BATCH_SIZE", 64))
+INGEST_INSERT_BATCH_SIZE = int(os.getenv("INGEST_INSERT_BATCH_SIZE", 50))
+# Batches buffered between two stages; with the batch sizes this caps chunks held in memory
+INGEST_QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", 4))
+
+_STAGE_DONE = object()
+
 
 class AstraDB:
     DEFAULT_DIMENSION = 384
@@ -29,7 +44,7 @@ class AstraDB:
             )
             self.collection_name = collection_name
             self.dimension = dimension
-            self.embedding_model = HFAPIEmbeddings()
+            self.embedding_model = HFAPIEmbeddings(use_store=True)
             logger.info(f"Using HFAPIEmbeddings ({self.dimension}D) via {os.getenv('EMBEDDING_API_URL')}")
         except Exception as e:
             logger.error(f"Failed to initialize AstraDB client or embedding API: {e}")
@@ -55,21 +70,7 @@ class AstraDB:
     def load_and_chunk_pdf(self, file_path: str, chunk_size: int = 500, chunk_overlap: int = 100) -> List[Dict[str, Any]]:
         try:
             logger.info(f"Loading and splitting PDF: {file_path}")
-            loader = PyPDFLoader(file_path)
-            documents = loader.load()
-            splitter = RecursiveCharacterTextSplitter(
-                chunk_size=chunk_size,
-                chunk_overlap=chunk_overlap,
-                separators=["\n\n", ".", "!", "?"]
-            )
-            split_docs = splitter.split_documents(documents)
-            chunks = []
-            for doc in split_docs:
-                chunks.append({
-                    "file_name": os.path.basename(file_path),
-                    "text": doc.page_content.strip(),
-                    "metadata": doc.metadata,
-                })
+            chunks = chunk_pdf(file_path, chunk_size, chunk_overlap)
             logger.info(f"Split {os.path.basename(file_path)} into {len(chunks)} chunks.")
             return chunks
         except Exception as e:
@@ -80,11 +81,12 @@ class AstraDB:
         try:
             logger.info(f"Vectorizing {len(chunks)} text chunks via HF API...")
             texts = [chunk["text"] for chunk in chunks]
-            # Call HF API for embeddings
-            embeddings = asyncio.run(self.embedding_model.embed_documents(texts))
+            # Batched HF API calls over the keep-alive client of this embed worker's long-lived loop
+            embeddings = run_async(self.embedding_model.embed_documents(texts))
             vectorized_docs = []
             for i, chunk in enumerate(chunks):
                 doc = {
+                    **({"_id": chunk["_id"]} if "_id" in chunk else {}),
                     "file_name": chunk["file_name"],
                     "metadata": chunk.get("metadata", {}),
                     "text": chunk["text"],
@@ -110,7 +112,49 @@ class AstraDB:
             logger.error(f"Failed to push data to AstraDB: {e}")
             raise UdayamitraException("Failed to push data to AstraDB", sys)
 
-    def process_and_push_directory(self, directory_path: str):
+    @staticmethod
+    def _insert_idempotent(collection, docs: List[Dict[str, Any]]):
+        """
+        insert_many that treats documents whose `_id` is already stored as inserted. Chunk IDs are
+        deterministic, so those are the same chunks, left behind by a run that stopped before its
+        checkpoint was saved.
+        """
+        try:
+            collection.insert_many(docs, ordered=False)
+        except CollectionInsertManyException as e:
+            if not e.exceptions:
+                raise
+            for error in e.exceptions:
+                descriptors = error.error_descriptors if isinstance(error, DataAPIResponseException) else []
+                if not descriptors or any(d.error_code != "DOCUMENT_ALREADY_EXISTS" for d in descriptors):
+                    raise
+            logger.info(f"{len(docs) - len(e.inserted_ids)} of {len(docs)} chunks were already stored.")
+
+    def delete_from_collection(self, ids: List[str]):
+        try:
+            collection = self.database.get_collection(self.collection_name)
+            for start in range(0, len(ids), 100):  # Data API limit for $in
+                collection.delete_many({"_id": {"$in": ids[start:start + 100]}})
+            logger.info(f"Deleted {len(ids)} stale documents from '{self.collection_name}'.")
+        except Exception as e:
+            logger.error(f"Failed to delete documents from AstraDB: {e}")
+            raise UdayamitraException("Failed to delete documents from AstraDB", sys)
+
+    def process_and_push_directory(self, directory_path: str, dry_run: bool = False):
+        """
+        Pushes the PDFs in `directory_path` that are new or changed since the last run, and deletes
+        the chunks of PDFs that were removed. Chunks keep deterministic `_id`s, so unchanged chunks
+        of a changed PDF are neither re-embedded nor re-inserted. `dry_run` only logs the delta.
+
+        Work streams through bounded queues (PDF -> chunks -> embedding batches -> insert batches):
+        PDFs are parsed and chunked on a process pool and enter the embedding stage in completion
+        order; embedding and inserting run on worker threads. Memory does not grow with the number
+        of PDFs, but a worker returns a whole PDF's chunk list at once: at most
+        INGEST_EXTRACT_WORKERS such lists are in flight, plus the bounded queues between stages, so
+        the peak scales with the largest PDFs. Every insert batch is checkpointed in the manifest: an interrupted run picks up
+        where it stopped instead of re-embedding finished work. A PDF that fails to parse is
+        reported and skipped, and retried on the next run.
+        """
         try:
             pdf_files = [
                 os.path.join(directory_path, f)
@@ -118,13 +162,186 @@ class AstraDB:
                 if f.lower().endswith(".pdf")
             ]
             logger.info(f"Found {len(pdf_files)} PDFs in {directory_path}.")
-            all_docs = []
-            for file in pdf_files:
-                chunks = self.load_and_chunk_pdf(file)
-                vectorized = self.vectorize_chunks(chunks)
-                all_docs.extend(vectorized)
-            self.push_to_collection(all_docs)
-            logger.info(f"Successfully ingested {len(all_docs)} chunks from {len(pdf_files)} PDFs into AstraDB.")
+
+            manifest = IngestionManifest(self.collection_name)
+            plan = manifest.plan({os.path.basename(file): [file] for file in pdf_files})
+            logger.info(f"Ingestion plan for '{self.collection_name}':\n{plan.summary()}")
+            if dry_run:
+                return plan
+
+            self.create_collection()
+            for doc_id in plan.removed:
+                stale_ids = manifest.chunk_ids(doc_id)
+                if stale_ids:
+                    self.delete_from_collection(stale_ids)
+                manifest.forget(doc_id)
+                manifest.save()
+
+            files = [file for file in pdf_files if os.path.basename(file) in plan.to_process]
+            totals = self._run_pipeline(files, manifest, plan)
+            logger.info(
+                f"Successfully ingested {totals['inserted']} new chunks and deleted {totals['deleted']} stale ones "
+                f"({len(plan.to_process)} new or changed, {len(plan.removed)} removed PDFs) into AstraDB."
+            )
+            if totals["failed_files"]:
+                logger.warning(f"{len(totals['failed_files'])} PDFs could not be parsed: {totals['failed_files']}")
         except Exception as e:
             logger.error(f"Failed to process directory '{directory_path}': {e}")
-            raise UdayamitraException("Failed to process directory", sys)
\ No newline at end of file
+            raise UdayamitraException("Failed to process directory", sys)
+
+    def _run_pipeline(self, files: List[str], manifest: IngestionManifest, plan) -> Dict[str, Any]:
+        collection = self.database.get_collection(self.collection_name)
+        chunk_queue: queue.Queue = queue.Queue(maxsize=INGEST_QUEUE_SIZE)
+        doc_queue: queue.Queue = queue.Queue(maxsize=INGEST_QUEUE_SIZE)
+
+        failed = threading.Event()
+        errors: List[BaseException] = []
+        manifest_lock = threading.Lock()
+        inserted: Dict[str, int] = {}
+        finished: Dict[str, tuple] = {}  # doc_id -> (all chunk ids, number of new chunks)
+        totals = {"inserted": 0, "deleted": 0, "failed_files": []}
+
+        def put(q: queue.Queue, item):
+            # Blocks while the next stage is behind, but gives up once any stage has failed
+            while not failed.is_set():
+                try:
+                    q.put(item, timeout=0.5)
+                    return
+                except queue.Full:
+                    continue
+            raise RuntimeError("ingestion pipeline aborted")
+
+        def get(q: queue.Queue):
+            # Waits for the previous stage, but stops waiting once any stage has failed
+            while True:
+                try:
+                    return q.get(timeout=0.5)
+                except queue.Empty:
+                    if failed.is_set():
+                        return _STAGE_DONE
+
+        def worker(fn):
+            def run():
+                try:
+                    fn()
+                except BaseException as e:
+                    if not failed.is_set():
+                        errors.append(e)
+                    failed.set()
+            return run
+
+        def extract():
+            jobs = ((file, (file,)) for file in files)
+            # One job per worker: a finished PDF waits for this thread before the next one starts
+            results = imap_unordered(chunk_pdf, jobs, workers=INGEST_EXTRACT_WORKERS, max_pending=INGEST_EXTRACT_WORKERS)
+            try:
+                for result in results:
+                    if failed.is_set():
+                        return
+                    if not result.ok:
+                        totals["failed_files"].append(result.key)
+                        continue
+                    doc_id = os.path.basename(result.key)
+                    with manifest_lock:
+                        previous_ids = set(manifest.chunk_ids(doc_id))
+                    ids, batch, new = [], [], 0
+                    for i, chunk in enumerate(result.value):
+                        chunk["_id"] = chunk_id(doc_id, i, chunk["text"])
+                        ids.append(chunk["_id"])
+                        if chunk["_id"] in previous_ids:
+                            continue
+                        batch.append(chunk)
+                        new += 1
+                        if len(batch) >= INGEST_EMBED_BATCH_SIZE:
+                            put(chunk_queue, ("chunks", doc_id, batch))
+                            batch = []
+                    if batch:
+                        put(chunk_queue, ("chunks", doc_id, batch))
+                    put(chunk_queue, ("end", doc_id, ids, new))
+            finally:
+                results.close()
+
+        def embed():
+            while True:
+                item = get(chunk_queue)
+                if item is _STAGE_DONE or failed.is_set():
+                    return
+                if item[0] == "chunks":
+                    item = ("docs", item[1], self.vectorize_chunks(item[2]))
+                put(doc_queue, item)
+
+        def finish(doc_id: str):
+            # Caller holds manifest_lock; the document is complete once every new chunk is stored
+            if doc_id not in finished or inserted.get(doc_id, 0) < finished[doc_id][1]:
+                return
+            ids, _ = finished.pop(doc_id)
+            stale_ids = list(set(manifest.chunk_ids(doc_id)) - set(ids))
+            if stale_ids:
+                self.delete_from_collection(stale_ids)
+                totals["deleted"] += len(stale_ids)
+            manifest.record(doc_id, plan.fingerprints[doc_id], ids)
+            manifest.save()
+
+        def insert():
+            while True:
+                item = get(doc_queue)
+                if item is _STAGE_DONE or failed.is_set():
+                    return
+                kind, doc_id = item[0], item[1]
+                if kind == "docs":
+                    docs = item[2]
+                    for start in range(0, len(docs), INGEST_INSERT_BATCH_SIZE):
+                        batch = docs[start:start + INGEST_INSERT_BATCH_SIZE]
+                        # A crash after this call but before the checkpoint leaves stored chunks
+                        # missing from the manifest; the retry finds them already there
+                        self._insert_idempotent(collection, batch)
+                        with manifest_lock:
+                            manifest.mark_inserted(doc_id, [doc["_id"] for doc in batch])
+                            manifest.save()
+                            inserted[doc_id] = inserted.get(doc_id, 0) + len(batch)
+                            totals["inserted"] += len(batch)
+                with manifest_lock:
+                    if kind == "end":
+                        finished[doc_id] = (item[2], item[3])
+                    finish(doc_id)
+
+        def start(fn, count: int, name: str) -> List[threading.Thread]:
+            threads = [threading.Thread(target=worker(fn), name=f"ingest-{name}-{i}", daemon=True) for i in range(max(1, count))]
+            for thread in threads:
+                thread.start()
+            return threads
+
+        def drain(q: queue.Queue):
+            while True:
+                try:
+                    q.get_nowait()
+                except queue.Empty:
+                    return
+
+        def close(threads: List[threading.Thread], downstream: queue.Queue, consumers: int):
+            for thread in threads:
+                thread.join()
+            if failed.is_set():
+                # Nothing will process the queued work; drained once, so the stop markers below survive
+                drain(downstream)
+            for _ in range(consumers):
+                while True:
+                    try:
+                        downstream.put(_STAGE_DONE, timeout=0.5)
+                        break
+                    except queue.Full:
+                        # After a failure, consumers stop on their own once their get() times out
+                        if failed.is_set():
+                            return
+
+        extractors = start(extract, 1, "extract")
+        embedders = start(embed, INGEST_EMBED_WORKERS, "embed")
+        inserters = start(insert, INGEST_INSERT_WORKERS, "insert")
+        close(extractors, chunk_queue, len(embedders))
+        close(embedders, doc_queue, len(inserters))
+        for thread in inserters:
+            thread.join()
+
+        if errors:
+            raise errors[0]
+        return totals
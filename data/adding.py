@@ -1,11 +1,11 @@
 import os
-import fitz
 from dotenv import load_dotenv
 from Logging.logger import logger
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_astradb import AstraDBVectorStore
 from langchain_core.documents import Document
 from langchain_community.embeddings import SentenceTransformerEmbeddings
+from utility.PDFExtraction import extract_text
 import nest_asyncio
 nest_asyncio.apply()
 
@@ -25,14 +25,10 @@ vectorstore = AstraDBVectorStore(
 
 
 def extract_text_from_pdf(filepath):
-    """Extracts text from a PDF file using fitz (PyMuPDF)."""
+    """Extracts text from a PDF file using fitz (PyMuPDF), cached by file content."""
     try:
-        if not hasattr(fitz, 'open'):
-            raise ImportError("fitz.open not found. Check PyMuPDF installation.")
-
         logger.debug(f"Loading PDF with fitz: {filepath}")
-        with fitz.open(filepath) as doc:
-            full_text = "\n".join(page.get_text() for page in doc)
+        full_text = extract_text(filepath)
         logger.debug(f"Extracted {len(full_text)} characters from {filepath}")
         return full_text
     except Exception as e:
@@ -1,12 +1,14 @@
 import os
 import json
-import fitz
+import argparse
+from functools import lru_cache
 from dotenv import load_dotenv
 from Logging.logger import logger
-from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_astradb import AstraDBVectorStore
 from langchain_core.documents import Document
-from utility.Embedder import HFAPIEmbeddings 
+from utility.Embedder import RemoteHFEmbeddings
+from utility.IngestionManifest import IngestionManifest, chunk_id
+from utility.PDFExtraction import extract_and_split, imap_unordered
 import nest_asyncio
 nest_asyncio.apply()
 
@@ -16,38 +18,21 @@ load_dotenv()
 PDF_DIR = "data/raw/pdfs/new"
 # TXT_DIR = "data/raw/webpages"
 COLLECTION_NAME = "Mospi_data"
-embedding_model = HFAPIEmbeddings()
 
-vectorstore = AstraDBVectorStore(
-    embedding=embedding_model,
-    collection_name=COLLECTION_NAME,
-    api_endpoint=os.getenv("ASTRA_DB_ENDPOINT_2"),
-    token=os.getenv("ASTRA_DB_TOKEN_2"),
-)
 
+@lru_cache(maxsize=1)
+def get_vectorstore():
+    # Built on first use, not at import: PDF extraction workers re-import this module when spawned
+    return AstraDBVectorStore(
+        # Embeds in batches over one keep-alive client; AstraDBVectorStore calls it synchronously
+        embedding=RemoteHFEmbeddings(use_store=True),
+        collection_name=COLLECTION_NAME,
+        api_endpoint=os.getenv("ASTRA_DB_ENDPOINT_2"),
+        token=os.getenv("ASTRA_DB_TOKEN_2"),
+    )
 
-def extract_text_from_pdf(filepath):
-    try:
-        doc = fitz.open(filepath)
-        return "\n".join(page.get_text() for page in doc)
-    except Exception as e:
-        logger.error(f"Error reading {filepath}: {e}")
-        return ""
-
-
-def extract_text_from_txt(filepath):
-    try:
-        with open(filepath, "r", encoding="utf-8") as f:
-            return f.read()
-    except Exception as e:
-        logger.error(f"Error reading {filepath}: {e}")
-        return ""
-
-
-def chunk_text(text, metadata):
-    splitter = RecursiveCharacterTextSplitter(chunk_size=700, chunk_overlap=100)
-    chunks = splitter.split_text(text)
 
+def chunk_text(chunks, metadata):
     documents = []
     for i, chunk in enumerate(chunks):
         doc = Document(
@@ -61,7 +46,11 @@ def chunk_text(text, metadata):
     return documents
 
 
-def ingest_all():
+def ingest_all(dry_run: bool = False):
+    """
+    Ingests the document groups under PDF_DIR that are new or changed since the last run and
+    deletes the chunks of groups that disappeared. With `dry_run`, only logs the planned delta.
+    """
     groups = {}
 
     for root, _, files in os.walk(PDF_DIR):
@@ -77,18 +66,49 @@ def ingest_all():
     #         key = os.path.splitext(fname)[0]
     #         groups.setdefault(key, {})["txt"] = os.path.join(TXT_DIR, fname)
 
-    for doc_id, files in groups.items():
-        logger.info(f"\nProcessing document group: {doc_id}")
-        text = ""
-
-        if "txt" in files:
-            text += extract_text_from_txt(files["txt"])
-
-        for pdf_path in files.get("pdfs", []):
-            text += "\n" + extract_text_from_pdf(pdf_path)
-
-        if not text.strip():
+    manifest = IngestionManifest(COLLECTION_NAME)
+    # Text files first, then PDFs: the order their text is joined in
+    sources = {
+        doc_id: ([files["txt"]] if "txt" in files else []) + files.get("pdfs", [])
+        for doc_id, files in groups.items()
+    }
+    plan = manifest.plan(sources)
+    logger.info(f"Ingestion plan for '{COLLECTION_NAME}':\n{plan.summary()}")
+    if dry_run:
+        return plan
+
+    vectorstore = get_vectorstore()
+    for doc_id in plan.removed:
+        try:
+            stale_ids = manifest.chunk_ids(doc_id)
+            if stale_ids:
+                vectorstore.delete(ids=stale_ids)
+            manifest.forget(doc_id)
+            manifest.save()
+            logger.info(f"Deleted {len(stale_ids)} chunks for removed group {doc_id}")
+        except Exception as e:
+            logger.error(f"Failed to delete chunks for {doc_id}: {e}")
+
+    # Text extraction and splitting run on a process pool; groups are inserted as they finish
+    jobs = ((doc_id, (sources[doc_id],)) for doc_id in plan.to_process)
+    failed = []
+    for result in imap_unordered(extract_and_split, jobs):
+        doc_id, files = result.key, groups[result.key]
+        logger.info(f"\nProcessing document group: {doc_id} (extracted in {result.seconds:.2f}s)")
+        if not result.ok:
+            failed.append(doc_id)
+            continue
+        if not result.value:
             logger.warning(f"No text found for group {doc_id}, skipping.")
+            try:
+                # Recorded with no chunks, so unchanged files are not re-extracted on every run
+                stale_ids = manifest.chunk_ids(doc_id)
+                if stale_ids:
+                    vectorstore.delete(ids=stale_ids)
+                manifest.record(doc_id, plan.fingerprints[doc_id], [])
+                manifest.save()
+            except Exception as e:
+                logger.error(f"Failed to record empty group {doc_id}: {e}")
             continue
 
         metadata = {
@@ -98,16 +118,30 @@ def ingest_all():
             "scheme_name": doc_id.replace("_", " ").title()
         }
 
-        documents = chunk_text(text, metadata)
+        documents = chunk_text(result.value, metadata)
 
         if documents:
             try:
-                embeddings = embedding_model.embed_documents_sync([doc.page_content for doc in documents])
-                vectorstore.add_documents(documents, embeddings=embeddings)
-                logger.info(f"Inserted {len(documents)} chunks for {doc_id}")
+                ids = [chunk_id(doc_id, doc.metadata["chunk_index"], doc.page_content) for doc in documents]
+                previous_ids = set(manifest.chunk_ids(doc_id))
+                new = [(i, doc) for i, doc in zip(ids, documents) if i not in previous_ids]
+                stale_ids = list(previous_ids - set(ids))
+
+                if new:
+                    vectorstore.add_documents([doc for _, doc in new], ids=[i for i, _ in new])
+                if stale_ids:
+                    vectorstore.delete(ids=stale_ids)
+                manifest.record(doc_id, plan.fingerprints[doc_id], ids)
+                manifest.save()
+                logger.info(f"Inserted {len(new)} and deleted {len(stale_ids)} chunks for {doc_id} ({len(ids) - len(new)} unchanged)")
             except Exception as e:
                 logger.error(f"Failed to insert chunks for {doc_id}: {e}")
 
+    if failed:
+        logger.warning(f"{len(failed)} document groups could not be extracted and will be retried next run: {failed}")
+
 
 if __name__ == "__main__":
-    ingest_all()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description=f"Incrementally ingest {PDF_DIR} into {COLLECTION_NAME}")
+    parser.add_argument("--dry-run", action="store_true", help="only print the planned delta")
+    ingest_all(dry_run=parser.parse_args().dry_run)
\ No newline at end of file
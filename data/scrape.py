@@ -5,9 +5,10 @@ import requests
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse
 from typing import List, Dict
-from langchain_community.document_loaders import PlaywrightURLLoader, PyMuPDFLoader
+from langchain_community.document_loaders import PlaywrightURLLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from utility.LLM import LLMClient
+from utility.PDFExtraction import extract_text
 
 def get_clean_web_content(url: str) -> str:
     try:
@@ -38,9 +39,8 @@ def extract_pdf_content(pdf_urls: List[str]) -> str:
             with open(filename, 'wb') as f:
                 f.write(response.content)
 
-            loader = PyMuPDFLoader(filename)
-            docs = loader.load()
-            combined_text += "\n".join([doc.page_content for doc in docs])
+            # PyMuPDF text through the TextCache, keyed by content: re-scraping the same PDF skips parsing
+            combined_text += extract_text(filename)
             os.remove(filename)
 
         except Exception as e:
@@ -1,8 +1,8 @@
 import os
 import json
-import fitz
 from utility.LLM import LLMClient
 from Logging.logger import logger
+from utility.PDFExtraction import extract_text
 
 def read_text_file(filepath: str) -> str:
     try:
@@ -14,9 +14,8 @@ def read_text_file(filepath: str) -> str:
 
 def extract_text_from_pdf(filepath: str) -> str:
     try:
-        doc = fitz.open(filepath)
-        text = "\n".join(page.get_text() for page in doc)
-        return text
+        # Cached by file content, so regenerating schemas does not re-parse unchanged PDFs
+        return extract_text(filepath)
     except Exception as e:
         logger.error(f"Failed to extract PDF {filepath}: {e}")
         return ""
@@ -0,0 +1,191 @@
+import re
+from typing import Any, Callable, Dict, List, Optional, Type
+
+from pydantic import BaseModel
+
+from router.ModelResolver import ModelResolver
+from Logging.logger import logger
+
+
+def _as_items(value: Any) -> List[str]:
+    """Normalizes a list field; strings with newlines are split into one item per line."""
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = value.splitlines()
+    items = []
+    for item in value:
+        # Strip any bullet or numbering the model already put in front of the item
+        text = re.sub(r"^\s*(?:[-*•]|\d+[.)])\s+", "", str(item)).strip()
+        if text:
+            items.append(text)
+    return items
+
+
+def _bullets(items: List[str]) -> str:
+    return "\n".join(f"- {item}" for item in items)
+
+
+def _numbered(items: List[str]) -> str:
+    return "\n".join(f"{i}. {item}" for i, item in enumerate(items, start=1))
+
+
+def _table(rows: Any) -> str:
+    rows = [row for row in (rows or []) if isinstance(row, dict)]
+    if not rows:
+        return ""
+    columns: List[str] = []
+    for row in rows:
+        columns.extend(key for key in row if key not in columns)
+
+    def cell(value: Any) -> str:
+        return ("" if value is None else str(value)).replace("|", "\\|").replace("\n", " ")
+
+    lines = [
+        "| " + " | ".join(cell(col) for col in columns) + " |",
+        "| " + " | ".join("---" for _ in columns) + " |",
+    ]
+    lines.extend("| " + " | ".join(cell(row.get(col)) for col in columns) + " |" for row in rows)
+    return "\n".join(lines)
+
+
+def _section(title: str, body: str) -> str:
+    return f"**{title}**\n{body}" if body else ""
+
+
+def _sources(value: Any) -> str:
+    items = _as_items(value)
+    return f"Sources: {', '.join(items)}" if items else ""
+
+
+def _follow_ups(value: Any) -> str:
+    items = _as_items(value)
+    return f"### Follow-up Questions:\n{_bullets(items)}" if items else ""
+
+
+def _bold(value: Any) -> str:
+    text = str(value or "").strip()
+    return f"**{text}**" if text else ""
+
+
+def _join(*blocks: Any) -> str:
+    texts = (str(block).strip() for block in blocks if block)
+    return "\n\n".join(text for text in texts if text)
+
+
+def _humanize(field: str) -> str:
+    return field.replace("_", " ").strip().capitalize()
+
+
+class MarkdownRenderer:
+    def __init__(self, module_path: str = "utility.model"):
+        """
+        Renders known tool output schemas to Markdown without an LLM round-trip.
+        Templates are keyed by the `output_schema` name in the tool registry.
+        """
+        self.resolver = ModelResolver(module_path)
+        self.templates: Dict[str, Callable[[Dict[str, Any]], str]] = {
+            "AnalysisGeneratorOutput": self._render_analysis,
+            "InsightGeneratorOutput": self._render_insight,
+            "EligibilityCheckResponse": self._render_eligibility,
+            "SchemeExplanationResponse": self._render_scheme_explanation,
+        }
+
+    def render(self, data: Dict[str, Any], schema_name: Optional[str] = None) -> Optional[str]:
+        """
+        Returns Markdown for `data`, or None when it does not match any known schema.
+        `schema_name` is tried first; otherwise the first template whose schema fits is used.
+        """
+        candidates = [schema_name] if schema_name in self.templates else []
+        candidates += [name for name in self.templates if name not in candidates]
+
+        for name in candidates:
+            payload = self._unwrap(name, data)
+            if self._matches(name, payload):
+                logger.info(f"[MarkdownRenderer] Rendering output with '{name}' template")
+                return self.templates[name](payload)
+
+        logger.info(f"[MarkdownRenderer] No template matches output keys {sorted(data)}")
+        return None
+
+    @staticmethod
+    def _unwrap(schema_name: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        # EligibilityChecker nests the response and adds generated follow-up questions alongside it
+        if schema_name == "EligibilityCheckResponse" and isinstance(data.get("eligibility"), dict):
+            return {**data["eligibility"], "follow_up_questions": data.get("follow_up_questions")}
+        return data
+
+    def _matches(self, schema_name: str, data: Dict[str, Any]) -> bool:
+        model_class: Type[BaseModel] = self.resolver.resolve(schema_name)
+        required = [name for name, field in model_class.model_fields.items() if field.is_required()]
+        return all(name in data for name in required)
+
+    @staticmethod
+    def render_generic(data: Dict[str, Any]) -> str:
+        """Fallback for unknown shapes: one section per key, lists as bullets, lists of objects as tables."""
+        if set(data) == {"output_text"}:
+            # Plain text the tool returned (or that could not be parsed as JSON)
+            return str(data["output_text"]).strip()
+        blocks = []
+        for key, value in data.items():
+            if value in (None, "", [], {}):
+                continue
+            if key == "sources":
+                continue
+            if isinstance(value, list) and all(isinstance(v, dict) for v in value):
+                body = _table(value)
+            elif isinstance(value, list):
+                body = _bullets(_as_items(value))
+            elif isinstance(value, dict):
+                body = _bullets([f"{_humanize(k)}: {v}" for k, v in value.items()])
+            else:
+                body = str(value).strip()
+            blocks.append(_section(_humanize(key), body))
+        return _join(*blocks, _sources(data.get("sources")))
+
+    def _render_analysis(self, data: Dict[str, Any]) -> str:
+        return _join(
+            _bold(data.get("insight_summary")),
+            data["detailed_explanation"],
+            _section("Key Data Points", _bullets(_as_items(data["data_summary"]))),
+            _section("Actionable Steps", _numbered(_as_items(data["actionable_steps"]))),
+            _table(data.get("data_table")),
+            _sources(data.get("sources")),
+        )
+
+    def _render_insight(self, data: Dict[str, Any]) -> str:
+        return _join(
+            _bold(data.get("insight_summary")),
+            data["detailed_explanation"],
+            _section("Potential Benefits", _bullets(_as_items(data["potential_benefits"]))),
+            _section("Associated Risks", _bullets(_as_items(data["associated_risks"]))),
+            _section("Actionable Steps", _numbered(_as_items(data["actionable_steps"]))),
+            _sources(data.get("sources")),
+        )
+
+    def _render_eligibility(self, data: Dict[str, Any]) -> str:
+        eligible = data.get("eligible")
+        if eligible is True:
+            verdict = "You appear to be **eligible** for this scheme."
+        elif eligible is False:
+            verdict = "You do **not** appear to be eligible for this scheme."
+        else:
+            verdict = "Eligibility **could not be determined** yet; more information is needed."
+
+        return _join(
+            f"**Eligibility: {data['scheme_name']}**",
+            verdict,
+            _section("Reasons", _bullets(_as_items(data["reasons"]))),
+            _section("Missing Information", _bullets([_humanize(f) for f in _as_items(data.get("missing_fields"))])),
+            _follow_ups(data.get("follow_up_questions")),
+            _sources(data.get("sources")),
+        )
+
+    def _render_scheme_explanation(self, data: Dict[str, Any]) -> str:
+        explanation = re.sub(r"(\s*\n\s*){2,}", "\n\n", str(data["explanation"]).strip())
+        return _join(
+            f"**{data['scheme_name']}**",
+            explanation,
+            _follow_ups(data.get("follow_up_suggestions")),
+            _sources(data.get("sources")),
+        )
@@ -1,21 +1,107 @@
 import json
-from typing import Dict, Any, Type
+import threading
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple, Type
 from pydantic import BaseModel, ValidationError
 from utility.LLM import LLMClient
-from utility.model import ConversationState
+from utility.model import ConversationState, SchemeMetadata, EligibilityCheckRequest, InsightGeneratorInput
+from Logging.logger import logger
+
+
+# Tool inputs whose fields the rule map was written for; anything else is filled by the LLM
+_RULE_MODELS = (SchemeMetadata, EligibilityCheckRequest, InsightGeneratorInput)
+
+
+@lru_cache(maxsize=None)
+def _schema_json(model_class: Type[BaseModel]) -> str:
+    """JSON schema text for the prompt; built once per model class."""
+    return json.dumps(model_class.model_json_schema(), indent=2)
+
+
+def _first(value: Any) -> Any:
+    return value[0] if isinstance(value, list) and value else value
+
+
+def _is_entity_value(value: Any) -> bool:
+    # context_entities only accepts strings or lists of strings
+    return isinstance(value, str) or (isinstance(value, list) and all(isinstance(v, str) for v in value))
+
 
 class SchemaGenerator:
     def __init__(self):
         self.llm = LLMClient(model="meta-llama/llama-4-maverick-17b-128e-instruct")
+        # How each instance was filled: "rules" (no LLM), "hybrid" (LLM for some fields), "llm" (LLM for all)
+        self._stats = {"rules": 0, "hybrid": 0, "llm": 0}
+        self._stats_lock = threading.Lock()
+
+    # --- Rule-based field resolution ---
+
+    def _rule_values(
+        self,
+        metadata: Dict[str, Any],
+        state: Optional[ConversationState],
+    ) -> Dict[str, Any]:
+        """Values for the field names tool input models use, taken verbatim from metadata and state."""
+        entities = metadata.get("entities") or {}
+        scheme = _first(entities.get("scheme")) or (state.last_scheme_mentioned if state else None)
+
+        user_profile = metadata.get("user_profile")
+        if not user_profile and state and state.user_profile:
+            user_profile = state.user_profile.model_dump()
+
+        context_entities = {
+            key: value
+            for key, value in {**((state.context_entities if state else None) or {}), **entities}.items()
+            if _is_entity_value(value)
+        }
 
-    def generate(
+        query = metadata.get("query")
+        values = {
+            "query": query,
+            "user_query": query,
+            "scheme_name": scheme or None,
+            "user_profile": user_profile,
+            "context_entities": context_entities or None,
+            "detected_intents": metadata.get("intents") or None,
+            # Tools that take documents retrieve their own; the planner never has any to pass
+            "retrieved_documents": [],
+        }
+        return {key: value for key, value in values.items() if value is not None}
+
+    def _resolve_fields(
+        self,
+        metadata: Dict[str, Any],
+        model_class: Type[BaseModel],
+        user_input: Dict[str, Any],
+        state: Optional[ConversationState],
+    ) -> Tuple[Dict[str, Any], List[str]]:
+        """Returns (resolved values, required fields that no rule could fill)."""
+        rule_values = self._rule_values(metadata, state) if model_class in _RULE_MODELS else {}
+        resolved: Dict[str, Any] = {}
+        unresolved: List[str] = []
+        for name, field in model_class.model_fields.items():
+            if name in user_input:
+                resolved[name] = user_input[name]
+            elif name in rule_values:
+                resolved[name] = rule_values[name]
+            elif field.is_required():
+                unresolved.append(name)
+        return resolved, unresolved
+
+    async def generate(
         self,
         metadata: Dict[str, Any],
         execution_plan: Dict[str, Any],
         model_class: Type[BaseModel],
         user_input: Dict[str, Any] = None,
         state: ConversationState | None = None,
+        fields: Optional[List[str]] = None,
+        resolved: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
+        """
+        Fills the schema with the LLM. When `fields` is given only those fields are asked
+        for, with the already `resolved` values passed along as context.
+        """
         user_input = user_input or {}
         context_hint = ""
         if state:
@@ -29,6 +115,17 @@ class SchemaGenerator:
             Previously detected entities (if any): {json.dumps(last_entities)}
             Use this context if the current query is ambiguous or a follow-up.
             """
+        history_block = "Conversation history:\n" + context_hint if state else ""
+
+        if fields:
+            task = (
+                f"These fields are already filled:\n\n{json.dumps(resolved or {}, indent=2, default=str)}\n\n"
+                f"Fill ONLY these fields: {', '.join(fields)}\n\n"
+                "Return only a valid JSON object containing those fields."
+            )
+        else:
+            task = "Return only a valid JSON object matching this schema."
+
         system_message = (
             "You are an intelligent assistant that helps populate structured input schemas "
             "based on metadata about a user query, a conversation history, and a target schema. "
@@ -40,20 +137,34 @@ class SchemaGenerator:
             f"{json.dumps(metadata, indent=2)}\n\n"
             f"And this is the execution plan:\n\n"
             f"{json.dumps(execution_plan, indent=2)}\n\n"
-            f"{'Conversation history:\n' + context_hint if state else ''}\n\n"
+            f"{history_block}\n\n"
             f"Based on this information, fill the input for this schema:\n\n"
-            f"{model_class.schema_json(indent=2)}\n\n"
-            "Return only a valid JSON object matching this schema."
+            f"{_schema_json(model_class)}\n\n"
+            f"{task}"
         )
 
         try:
-            llm_output = self.llm.run_json(system_message, user_message)
+            llm_output = await self.llm.arun_json(system_message, user_message)
         except Exception as e:
             raise ValueError(f"Failed to generate schema input via LLM: {e}")
 
+        if fields:
+            llm_output = {key: value for key, value in llm_output.items() if key in fields}
+            # `fields` may have failed validation on a user_input value; keep the LLM's correction
+            user_input = {key: value for key, value in user_input.items() if key not in fields}
         final_input = {**llm_output, **user_input}
         return final_input
 
+    def _record_path(self, path: str, model_class: Type[BaseModel], unresolved: List[str]):
+        with self._stats_lock:
+            self._stats[path] += 1
+        detail = f" (LLM filled: {', '.join(unresolved)})" if unresolved else ""
+        logger.info(f"[SchemaGenerator] {model_class.__name__} filled via '{path}' path{detail}")
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return dict(self._stats)
+
     # --- Minimal normalization helpers (added) ---
 
     def _coerce_location(self, loc: Any) -> Dict[str, Any]:
@@ -99,7 +210,7 @@ class SchemaGenerator:
 
         return data
 
-    def generate_instance(
+    async def generate_instance(
         self,
         metadata: Dict[str, Any],
         execution_plan: Dict[str, Any],
@@ -107,12 +218,45 @@ class SchemaGenerator:
         user_input: Dict[str, Any] = None,
         state: ConversationState | None = None,
     ) -> BaseModel:
-        raw_input = self.generate(metadata, execution_plan, model_class, user_input, state)
+        """
+        Fills `model_class` from metadata and conversation state directly, and only asks
+        the LLM for fields the rules could not resolve (or that failed validation).
+        """
+        user_input = user_input or {}
+        resolved, unresolved = self._resolve_fields(metadata, model_class, user_input, state)
+
+        if not unresolved:
+            try:
+                instance = model_class(**self._normalize_for_model(dict(resolved)))
+                self._record_path("rules", model_class, [])
+                return instance
+            except ValidationError as e:
+                # Retry the offending fields with the LLM rather than failing the whole tool call
+                unresolved = sorted({str(err["loc"][0]) for err in e.errors() if err.get("loc")})
+                for name in unresolved:
+                    resolved.pop(name, None)
+                if not unresolved:
+                    # No field to blame, so the LLM fills the whole schema
+                    resolved = {}
+                logger.warning(f"[SchemaGenerator] Rule-filled {model_class.__name__} failed validation on {unresolved}")
+
+        if resolved:
+            llm_input = await self.generate(
+                metadata, execution_plan, model_class, user_input, state,
+                fields=unresolved, resolved=resolved,
+            )
+            raw_input = {**resolved, **llm_input}
+            path = "hybrid"
+        else:
+            raw_input = await self.generate(metadata, execution_plan, model_class, user_input, state)
+            path = "llm"
 
         # --- Minimal, necessary normalization before Pydantic validation ---
         normalized_input = self._normalize_for_model(raw_input)
 
         try:
-            return model_class(**normalized_input)
+            instance = model_class(**normalized_input)
         except ValidationError as e:
             raise ValueError(f"LLM output did not match schema requirements:\n{e}")
+        self._record_path(path, model_class, unresolved)
+        return instance
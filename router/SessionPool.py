@@ -0,0 +1,244 @@
+'''
+SessionPool.py - Persistent MCP client sessions shared across requests.
+
+Opening a streamable-HTTP session costs a connection plus an `initialize`
+round-trip, so sessions are kept open per endpoint and reused. Each session is
+owned by a background task (the MCP client context managers must be entered and
+exited from the same task); callers only borrow the `ClientSession`.
+Sessions idle for a while are pinged before reuse, closed after `idle_timeout`,
+and replaced when a call fails at the transport level (the call itself is
+not retried, since the server may already have run it).
+'''
+
+import os
+import time
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+from mcp import ClientSession
+from mcp.client.streamable_http import streamablehttp_client
+from mcp.shared.exceptions import McpError
+
+from utility.async_utils import LoopLocal
+from utility.register_tools import registry_version
+from Logging.logger import logger
+
+MCP_MAX_SESSIONS_PER_ENDPOINT = int(os.getenv("MCP_MAX_SESSIONS_PER_ENDPOINT", 4))
+MCP_SESSION_IDLE_TIMEOUT = float(os.getenv("MCP_SESSION_IDLE_TIMEOUT", 300))
+MCP_HEALTH_CHECK_AFTER = float(os.getenv("MCP_HEALTH_CHECK_AFTER", 30))
+MCP_CONNECT_TIMEOUT = float(os.getenv("MCP_CONNECT_TIMEOUT", 30))
+
+
+class PooledSession:
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+        self.session: Optional[ClientSession] = None
+        self.in_use = 0
+        self.last_used = time.monotonic()
+        self._stop = asyncio.Event()
+        self._owner: Optional[asyncio.Task] = None
+
+    @property
+    def alive(self) -> bool:
+        return self._owner is not None and not self._owner.done() and self.session is not None
+
+    async def open(self):
+        ready = asyncio.get_running_loop().create_future()
+        self._owner = asyncio.create_task(self._own(ready))
+        await asyncio.wait_for(ready, timeout=MCP_CONNECT_TIMEOUT)
+
+    async def _own(self, ready: asyncio.Future):
+        try:
+            async with streamablehttp_client(url=self.endpoint) as (read_stream, write_stream, _):
+                async with ClientSession(read_stream, write_stream) as session:
+                    await session.initialize()
+                    self.session = session
+                    ready.set_result(None)
+                    await self._stop.wait()
+        except BaseException as e:
+            if not ready.done():
+                ready.set_exception(e)
+            elif not isinstance(e, asyncio.CancelledError):
+                logger.warning(f"[SessionPool] Session to {self.endpoint} closed with error: {e}")
+        finally:
+            self.session = None
+
+    async def ping(self, timeout: float = 5.0) -> bool:
+        try:
+            await asyncio.wait_for(self.session.send_ping(), timeout=timeout)
+            return True
+        except Exception as e:
+            logger.info(f"[SessionPool] Health check failed for {self.endpoint}: {e}")
+            return False
+
+    async def close(self):
+        self._stop.set()
+        if self._owner is not None:
+            try:
+                await asyncio.wait_for(self._owner, timeout=5.0)
+            except BaseException:
+                self._owner.cancel()
+
+
+class MCPSessionPool:
+    def __init__(
+        self,
+        max_sessions_per_endpoint: int = MCP_MAX_SESSIONS_PER_ENDPOINT,
+        idle_timeout: float = MCP_SESSION_IDLE_TIMEOUT,
+        health_check_after: float = MCP_HEALTH_CHECK_AFTER,
+    ):
+        self.max_sessions_per_endpoint = max(1, max_sessions_per_endpoint)
+        self.idle_timeout = idle_timeout
+        self.health_check_after = health_check_after
+        self._sessions: Dict[str, List[PooledSession]] = {}
+        # Per-endpoint, so a slow handshake with one server does not hold up the others
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._stats = {"opened": 0, "reused": 0, "evicted": 0, "reconnects": 0, "failed_health_checks": 0}
+
+    def _take_idle(self) -> List[PooledSession]:
+        """Removes dead sessions and sessions idle past `idle_timeout` from every endpoint."""
+        now = time.monotonic()
+        evicted = []
+        for sessions in self._sessions.values():
+            for pooled in list(sessions):
+                if pooled.in_use == 0 and (not pooled.alive or now - pooled.last_used > self.idle_timeout):
+                    sessions.remove(pooled)
+                    evicted.append(pooled)
+        self._stats["evicted"] += len(evicted)
+        return evicted
+
+    async def _checkout(self, endpoint: str) -> PooledSession:
+        for pooled in self._take_idle():
+            await pooled.close()
+
+        async with self._locks.setdefault(endpoint, asyncio.Lock()):
+            sessions = self._sessions.setdefault(endpoint, [])
+
+            # MCP sessions multiplex requests, so a busy session is shared once the endpoint is at its cap
+            candidates = sorted((s for s in sessions if s.alive), key=lambda s: s.in_use)
+            pooled = candidates[0] if candidates else None
+            if pooled is not None and pooled.in_use > 0 and len(sessions) < self.max_sessions_per_endpoint:
+                pooled = None
+
+            if pooled is not None and pooled.in_use == 0 and time.monotonic() - pooled.last_used > self.health_check_after:
+                if not await pooled.ping():
+                    self._stats["failed_health_checks"] += 1
+                    sessions.remove(pooled)
+                    await pooled.close()
+                    pooled = None
+
+            if pooled is None:
+                logger.info(f"[SessionPool] Opening MCP session to {endpoint}")
+                pooled = PooledSession(endpoint)
+                await pooled.open()
+                sessions.append(pooled)
+                self._stats["opened"] += 1
+            else:
+                self._stats["reused"] += 1
+
+            pooled.in_use += 1
+            return pooled
+
+    async def _discard(self, pooled: PooledSession):
+        sessions = self._sessions.get(pooled.endpoint, [])
+        if pooled in sessions:
+            sessions.remove(pooled)
+        await pooled.close()
+
+    async def _checkout_with_retry(self, endpoint: str) -> PooledSession:
+        # Nothing has been sent to the tool yet, so a failed checkout is safe to try again
+        try:
+            return await self._checkout(endpoint)
+        except McpError:
+            raise
+        except Exception as e:
+            logger.warning(f"[SessionPool] Connecting to {endpoint} failed ({e}); reconnecting")
+            self._stats["reconnects"] += 1
+            return await self._checkout(endpoint)
+
+    @asynccontextmanager
+    async def _lease(self, pooled: PooledSession):
+        try:
+            yield pooled.session
+        except McpError:
+            # The server answered, so the session itself is fine
+            raise
+        except Exception:
+            await self._discard(pooled)
+            raise
+        finally:
+            pooled.in_use -= 1
+            pooled.last_used = time.monotonic()
+
+    @asynccontextmanager
+    async def session(self, endpoint: str):
+        """Borrow an initialized session for `endpoint`; it goes back to the pool afterwards."""
+        async with self._lease(await self._checkout(endpoint)) as session:
+            yield session
+
+    async def call_tool(self, endpoint: str, tool_name: str, arguments: Dict[str, Any]):
+        """
+        Call a tool, reconnecting once if no session could be checked out. A failure of the call
+        itself is not retried: the server may already have run the tool, and tools are not
+        idempotent. The broken session is discarded, so the next call opens a fresh one.
+        """
+        pooled = await self._checkout_with_retry(endpoint)
+        async with self._lease(pooled) as session:
+            return await session.call_tool(tool_name, arguments)
+
+    async def list_tools(self, endpoint: str):
+        """`list_tools` for `endpoint`, cached until the tool registry changes."""
+        version = registry_version()
+        cached = _get_cached_tools(endpoint, version)
+        if cached is not None:
+            return cached
+        async with self.session(endpoint) as session:
+            tools = await session.list_tools()
+        _set_cached_tools(endpoint, version, tools)
+        return tools
+
+    async def close(self):
+        sessions = [pooled for group in self._sessions.values() for pooled in group]
+        self._sessions.clear()
+        for pooled in sessions:
+            await pooled.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "open_sessions": {endpoint: len(group) for endpoint, group in self._sessions.items() if group},
+        }
+
+
+# list_tools results are plain data, so unlike sessions they are shared by every event loop
+_tools_cache: Dict[str, Tuple[Any, Any]] = {}
+_tools_cache_lock = threading.Lock()
+
+
+def _get_cached_tools(endpoint: str, version: Any):
+    with _tools_cache_lock:
+        entry = _tools_cache.get(endpoint)
+    return entry[1] if entry is not None and entry[0] == version else None
+
+
+def _set_cached_tools(endpoint: str, version: Any, tools: Any):
+    with _tools_cache_lock:
+        _tools_cache[endpoint] = (version, tools)
+
+
+def invalidate_tools_cache(endpoint: Optional[str] = None):
+    with _tools_cache_lock:
+        if endpoint is None:
+            _tools_cache.clear()
+        else:
+            _tools_cache.pop(endpoint, None)
+
+
+# Sessions are bound to the event loop that opened them
+_pools = LoopLocal(MCPSessionPool)
+
+
+def get_session_pool() -> MCPSessionPool:
+    return _pools.get()
@@ -1,3 +1,4 @@
+import os
 import sys
 import json
 import asyncio
@@ -6,18 +7,17 @@ import ast
 from datetime import datetime
 from typing import Dict, Any, Union, Optional
 from pydantic import BaseModel
-from contextlib import asynccontextmanager
-
-from mcp import ClientSession
-from mcp.client.streamable_http import streamablehttp_client
 
 from router.ModelResolver import ModelResolver
 from router.SchemaGenerator import SchemaGenerator
+from router.MarkdownRenderer import MarkdownRenderer
+from router.SessionPool import get_session_pool
 from utility.model import (
     ExecutionPlan,
     ToolTask,
     ToolRegistryEntry,
     Metadata,
+    ConversationState,
 )
 from utility.StateManager import StateManager
 from utility.register_tools import load_registry_from_file
@@ -25,6 +25,13 @@ from utility.LLM import LLMClient
 from Logging.logger import logger
 from Exception.exception import UdayamitraException
 
+# Formatting is a pure function of the tool's JSON output
+FORMAT_CACHE_TTL = 6 * 60 * 60
+# Send tool outputs that match no known schema through the LLM formatter instead of the generic layout
+LLM_FORMAT_FALLBACK = os.getenv("LLM_FORMAT_FALLBACK", "false").lower() in ("1", "true", "yes")
+# Upper bound on tool calls in flight for one parallel plan
+TOOL_EXECUTOR_MAX_CONCURRENCY = int(os.getenv("TOOL_EXECUTOR_MAX_CONCURRENCY", 4))
+
 def safe_json_parse(raw_output: str) -> dict:
     import json, re
 
@@ -68,15 +75,31 @@ def _collect_extras_for_context(task_input: Dict[str, Any], known: set) -> Dict[
 
 
 class ToolExecutor:
-    def __init__(self, conversation_state: Optional[Any] = None):
+    def __init__(
+        self,
+        conversation_state: Optional[Any] = None,
+        tool_registry: Optional[Dict[str, ToolRegistryEntry]] = None,
+        llm_format_fallback: bool = LLM_FORMAT_FALLBACK,
+        max_concurrency: int = TOOL_EXECUTOR_MAX_CONCURRENCY,
+    ):
+        """
+        The executor holds no per-request data of its own when shared across requests:
+        pass `conversation_state` to `run_execution_plan` instead. The state given here is
+        only the default used when a call does not provide one.
+        Set `llm_format_fallback` to format unknown output shapes with the LLM.
+        `max_concurrency` caps how many tools a parallel plan calls at once.
+        """
         try:
             logger.info("Initializing ToolExecutor")
-            self.tool_registry: Dict[str, ToolRegistryEntry] = load_registry_from_file()
+            self.tool_registry: Dict[str, ToolRegistryEntry] = tool_registry if tool_registry is not None else load_registry_from_file()
             if not self.tool_registry:
                 raise UdayamitraException("Tool registry is empty. Ensure tools are registered properly.", sys)
 
             self.resolver = ModelResolver("utility.model")
             self.schema_generator = SchemaGenerator()
+            self.renderer = MarkdownRenderer("utility.model")
+            self.llm_format_fallback = llm_format_fallback
+            self.max_concurrency = max(1, max_concurrency)
             self.llm_client = LLMClient(model="meta-llama/llama-4-maverick-17b-128e-instruct")
 
             self.state_manager = StateManager(initial_state=conversation_state)
@@ -98,24 +121,14 @@ class ToolExecutor:
             logger.error(f"Failed to resolve schema: {e}")
             raise UdayamitraException(f"Failed to resolve schema: {e}", sys)
 
-    @asynccontextmanager
-    async def connect_to_server_for_tool(self, tool_name: str):
+    def _endpoint_for_tool(self, tool_name: str) -> str:
         if tool_name not in self.tool_registry:
-            raise UdayamitraException(f"Tool '{tool_name}' not found in registry.", sys)
+            raise ValueError(f"Tool '{tool_name}' not found in registry.")
+        return self.tool_registry[tool_name].endpoint
 
-        endpoint = self.tool_registry[tool_name].endpoint
-        logger.info(f"Connecting to MCP server at {endpoint} for tool '{tool_name}'")
-
-        async with streamablehttp_client(url=endpoint) as (read_stream, write_stream, _):
-            async with ClientSession(read_stream, write_stream) as session:
-                logger.info("Initializing MCP session...")
-                await session.initialize()
-                logger.info(f"MCP session initialized for {endpoint}")
-                yield session
-
-    async def get_required_inputs(self, session: ClientSession, tool_name: str) -> dict:
+    async def get_required_inputs(self, tool_name: str) -> dict:
         try:
-            response = await session.list_tools()
+            response = await get_session_pool().list_tools(self._endpoint_for_tool(tool_name))
             for tool in response.tools:
                 return {"server_Tool": tool.name, "required_input": tool.inputSchema.get("required", [])}
             logger.warning(f"Tool '{tool_name}' not found in list_tools response.")
@@ -145,61 +158,20 @@ class ToolExecutor:
         return cleaned
     
 
-    async def run_execution_plan(
-        self,
-        plan: ExecutionPlan,
-        metadata: Metadata,
-        flatten_output: bool = False
-    ) -> Union[str, Dict[str, Any]]:
-        results: Dict[str, Any] = {}
-
-        if isinstance(metadata.entities.get("scheme"), list):
-            metadata.entities["scheme"] = metadata.entities["scheme"][0]
-
-        self.state_manager.add_message(role="user", content=metadata.query)
-
-        if plan.execution_type != "sequential":
-            raise UdayamitraException(f"Execution type '{plan.execution_type}' not supported yet.", sys)
-
-        for task in plan.task_list:
-            async with self.connect_to_server_for_tool(task.tool_name) as session:
-                try:
-                    required_inputs = await self.get_required_inputs(session, task.tool_name)
-                    input_data = self._resolve_input(task, results)
-                    schema_class = self._get_schema(self.tool_registry[task.tool_name].input_schema)
-
-                    full_input = self.schema_generator.generate_instance(
-                        metadata=metadata.model_dump(),
-                        execution_plan=plan.model_dump(),
-                        model_class=schema_class,
-                        user_input=input_data,
-                        state=self.conversation_state
-                    )
-
-                    try:
-                        known = _model_known_fields(schema_class)
-                        extras = _collect_extras_for_context(task.input, known)
-
-                        if extras and ("context_entities" in known):
-                            current_ctx = getattr(full_input, "context_entities", None) or {}
-                            merged_ctx = {**current_ctx, **extras}
-
-                            full_input = full_input.copy(update={"context_entities": merged_ctx})
-
-                            self.state_manager.update_context_entities(merged_ctx)
-                    except Exception as _e:
-                        logger.warning(f"[extras passthrough] skipped: {_e}")
-                    
-                    logger.info(f"Calling tool '{task.tool_name}' with input: {full_input}")
-                    wrapped_input = {"schema_dict": full_input.model_dump()}
-                    logger.info(f"Wrapped input for tool '{task.tool_name}': {wrapped_input}")
-                    response = await session.call_tool(required_inputs["server_Tool"], wrapped_input)
-
-                    parsed = {}
-                    if hasattr(response, "content") and response.content:
-                        parsed = ensure_dict(safe_json_parse(response.content[0].text))
-                    
-                    system_prompt = '''You are an expert assistant that formats a tool's raw JSON output into a beautiful, user-friendly, and professional response using Markdown.
+    async def format_output(self, parsed: Dict[str, Any], output_schema: Optional[str] = None) -> str:
+        """
+        Turns a tool's JSON output into Markdown. Known output schemas are rendered from
+        templates; unknown shapes get a generic layout, or the LLM formatter when opted in.
+        """
+        rendered = self.renderer.render(parsed, output_schema)
+        if rendered is not None:
+            return rendered
+        if not self.llm_format_fallback:
+            return self.renderer.render_generic(parsed)
+        return await self._llm_format(parsed)
+
+    async def _llm_format(self, parsed: Dict[str, Any]) -> str:
+        system_prompt = '''You are an expert assistant that formats a tool's raw JSON output into a beautiful, user-friendly, and professional response using Markdown.
 
 Your task is to convert the user's JSON output into a formatted explanation.
 
@@ -217,40 +189,165 @@ RULES:
 6.  **Follow-up Questions:** If you generate follow-up questions, give them a `### Follow-up Questions:` heading.
 '''
 
-                    user_message = f"""Here is the tool's response:\n\n{json.dumps(parsed, indent=2)}\n\nPlease convert this into a beautiful, formatted Markdown explanation."""
-                    final_explanation = self.llm_client.run_chat(system_prompt, user_message)
+        user_message = f"""Here is the tool's response:\n\n{json.dumps(parsed, indent=2)}\n\nPlease convert this into a beautiful, formatted Markdown explanation."""
+        final_explanation = await self.llm_client.arun_chat(system_prompt, user_message, cache_ttl=FORMAT_CACHE_TTL)
 
-                    if isinstance(final_explanation, str) and '\\n' in final_explanation:
-                        try:
-                            final_explanation = ast.literal_eval(f"'''{final_explanation}'''")
-                        except Exception:
-                            final_explanation = final_explanation.replace("\\n", "\n")
+        if isinstance(final_explanation, str) and '\\n' in final_explanation:
+            try:
+                final_explanation = ast.literal_eval(f"'''{final_explanation}'''")
+            except Exception:
+                final_explanation = final_explanation.replace("\\n", "\n")
 
-                    formatted = self.format_explanation(raw=final_explanation)
-                    results[task.tool_name] = {
-                        "output_text": formatted,
-                        "raw_output": parsed
-                    }
+        return self.format_explanation(raw=final_explanation)
 
-                    self.state_manager.set_last_tool(task.tool_name)
-                    self.state_manager.set_tool_memory(task.tool_name, parsed)
-                    self.state_manager.add_message(role="tool", content=formatted, tool_used=task.tool_name)
-                    self.state_manager.set_last_scheme(metadata.entities.get("scheme", ""))
+    async def _run_task(
+        self,
+        task: ToolTask,
+        plan: ExecutionPlan,
+        metadata: Metadata,
+        results: Dict[str, Any],
+        state_manager: StateManager,
+        conversation_state: ConversationState,
+    ):
+        """Runs one task and stores its output (or failure message) under `results[task.tool_name]`."""
+        try:
+            required_inputs = await self.get_required_inputs(task.tool_name)
+            input_data = self._resolve_input(task, results)
+            schema_class = self._get_schema(self.tool_registry[task.tool_name].input_schema)
+
+            full_input = await self.schema_generator.generate_instance(
+                metadata=metadata.model_dump(),
+                execution_plan=plan.model_dump(),
+                model_class=schema_class,
+                user_input=input_data,
+                state=conversation_state
+            )
+
+            try:
+                known = _model_known_fields(schema_class)
+                extras = _collect_extras_for_context(task.input, known)
+
+                if extras and ("context_entities" in known):
+                    current_ctx = getattr(full_input, "context_entities", None) or {}
+                    merged_ctx = {**current_ctx, **extras}
+
+                    full_input = full_input.copy(update={"context_entities": merged_ctx})
+
+                    state_manager.update_context_entities(merged_ctx)
+            except Exception as _e:
+                logger.warning(f"[extras passthrough] skipped: {_e}")
+            
+            logger.info(f"Calling tool '{task.tool_name}' with input: {full_input}")
+            wrapped_input = {"schema_dict": full_input.model_dump()}
+            logger.info(f"Wrapped input for tool '{task.tool_name}': {wrapped_input}")
+            response = await get_session_pool().call_tool(
+                self._endpoint_for_tool(task.tool_name), required_inputs["server_Tool"], wrapped_input
+            )
+
+            parsed = {}
+            if hasattr(response, "content") and response.content:
+                parsed = ensure_dict(safe_json_parse(response.content[0].text))
+            
+            formatted = await self.format_output(parsed, self.tool_registry[task.tool_name].output_schema)
+            results[task.tool_name] = {
+                "output_text": formatted,
+                "raw_output": parsed
+            }
+
+            state_manager.set_last_tool(task.tool_name)
+            state_manager.set_tool_memory(task.tool_name, parsed)
+            state_manager.add_message(role="tool", content=formatted, tool_used=task.tool_name)
+            state_manager.set_last_scheme(metadata.entities.get("scheme", ""))
+
+            merged_context = {
+                **metadata.entities,
+                **(metadata.user_profile.model_dump() if metadata.user_profile else {})
+            }
+            state_manager.update_context_entities(merged_context)
 
-                    merged_context = {
-                        **metadata.entities,
-                        **(metadata.user_profile.model_dump() if metadata.user_profile else {})
-                    }
-                    self.state_manager.update_context_entities(merged_context)
+        except Exception as e:
+            logger.error(f"Error calling tool '{task.tool_name}': {e}")
+            results[task.tool_name] = f"Failed to process {task.tool_name}: {e}"
 
+    @staticmethod
+    def _task_dependencies(plan: ExecutionPlan) -> Dict[str, Optional[str]]:
+        """Maps each task to the task whose output it consumes, rejecting unknown or cyclic references."""
+        dependencies = {task.tool_name: task.input_from for task in plan.task_list}
+        for tool_name, dependency in dependencies.items():
+            if dependency is not None and dependency not in dependencies:
+                raise ValueError(f"Task '{tool_name}' depends on '{dependency}', which is not in the plan.")
+
+            seen = {tool_name}
+            while dependency is not None:
+                if dependency in seen:
+                    raise ValueError(f"Execution plan has a dependency cycle through '{tool_name}'.")
+                seen.add(dependency)
+                dependency = dependencies[dependency]
+        return dependencies
+
+    async def _run_parallel(
+        self,
+        plan: ExecutionPlan,
+        metadata: Metadata,
+        results: Dict[str, Any],
+        state_manager: StateManager,
+        conversation_state: ConversationState,
+    ):
+        """
+        Runs the plan as a DAG built from `input_from`: every task starts as soon as the
+        task it depends on has finished, with at most `max_concurrency` tool calls at once.
+        """
+        dependencies = self._task_dependencies(plan)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        running: Dict[str, asyncio.Task] = {}
+
+        async def run(task: ToolTask):
+            dependency = dependencies[task.tool_name]
+            if dependency is not None:
+                await running[dependency]
+            async with semaphore:
+                try:
+                    await self._run_task(task, plan, metadata, results, state_manager, conversation_state)
                 except Exception as e:
-                    logger.error(f"Error calling tool '{task.tool_name}': {e}")
+                    # e.g. the tool's server is unreachable; don't take the sibling tasks down with it
+                    logger.error(f"Error running task '{task.tool_name}': {e}")
                     results[task.tool_name] = f"Failed to process {task.tool_name}: {e}"
 
+        for task in plan.task_list:
+            running[task.tool_name] = asyncio.create_task(run(task))
+        await asyncio.gather(*running.values())
+
+        # Keep results in plan order regardless of which tool finished first
+        ordered = {task.tool_name: results[task.tool_name] for task in plan.task_list if task.tool_name in results}
+        results.clear()
+        results.update(ordered)
+
+    async def run_execution_plan(
+        self,
+        plan: ExecutionPlan,
+        metadata: Metadata,
+        flatten_output: bool = False,
+        conversation_state: Optional[ConversationState] = None,
+    ) -> Union[str, Dict[str, Any]]:
+        results: Dict[str, Any] = {}
+        state_manager = StateManager(initial_state=conversation_state) if conversation_state is not None else self.state_manager
+        conversation_state = state_manager.get_state()
+
+        if isinstance(metadata.entities.get("scheme"), list):
+            metadata.entities["scheme"] = metadata.entities["scheme"][0]
+
+        state_manager.add_message(role="user", content=metadata.query)
+
+        if plan.execution_type == "parallel":
+            await self._run_parallel(plan, metadata, results, state_manager, conversation_state)
+        else:
+            for task in plan.task_list:
+                await self._run_task(task, plan, metadata, results, state_manager, conversation_state)
+
         if flatten_output and len(results) == 1:
             return next(iter(results.values()))
 
-        logger.debug(f"[FINAL STATE BEFORE RETURN] {self.conversation_state.model_dump_json(indent=2)}")
+        logger.debug(f"[FINAL STATE BEFORE RETURN] {conversation_state.model_dump_json(indent=2)}")
         logger.info(f"Final Execution Results:\n{json.dumps(results, indent=2)}")
         return results if results else "No tools could be executed successfully."
 
@@ -1,10 +1,11 @@
 import json
 import re
 import sys
-from typing import List
+import threading
+from typing import Dict, List, Optional
 from dotenv import load_dotenv
 
-from utility.model import Metadata, ExecutionPlan, ToolTask, ConversationState
+from utility.model import Metadata, ExecutionPlan, ToolTask, ConversationState, ToolRegistryEntry
 from utility.LLM import LLMClient
 from router.ToolExecutor import safe_json_parse
 from Logging.logger import logger
@@ -13,17 +14,64 @@ from Exception.exception import UdayamitraException
 load_dotenv()
 
 class Planner:
-    def __init__(self, model: str = "meta-llama/llama-4-maverick-17b-128e-instruct"):
+    def __init__(
+        self,
+        model: str = "meta-llama/llama-4-maverick-17b-128e-instruct",
+        tool_registry: Optional[Dict[str, ToolRegistryEntry]] = None,
+    ):
+        """
+        Pass the `tool_registry` so multi-tool plans can be checked for chaining without
+        the LLM; without it only single-tool plans take the deterministic path.
+        """
         try:
             logger.info(f"Initializing Planner with model: {model}")
             self.llm_client = LLMClient(model=model)
+            self.tool_registry = tool_registry
+            self._stats = {"deterministic": 0, "llm": 0}
+            self._stats_lock = threading.Lock()
         except Exception as e:
             logger.error(f"Failed to initialize Planner: {e}")
             raise UdayamitraException("Failed to initialize Planner", sys)
 
-    def build_plan(self, metadata: Metadata, state: ConversationState | None = None) -> ExecutionPlan:
+    def _needs_chaining(self, tools: List[str]) -> bool:
+        """True when one required tool consumes what another produces, i.e. the plan needs `input_from`."""
+        if len(tools) <= 1:
+            return False
+        if self.tool_registry is None or any(tool not in self.tool_registry for tool in tools):
+            # Can't tell what the tools exchange, so let the LLM decide
+            return True
+        outputs = {self.tool_registry[tool].output_schema for tool in tools}
+        return any(self.tool_registry[tool].input_schema in outputs for tool in tools)
+
+    def build_direct_plan(self, metadata: Metadata) -> ExecutionPlan:
+        """
+        One independent task per required tool, each fed from the query and extracted entities.
+        Several tools run in parallel since none of them waits on another.
+        """
+        task_input = {"query": metadata.query, **metadata.entities}
+        return ExecutionPlan(
+            execution_type="parallel" if len(metadata.tools_required) > 1 else "sequential",
+            task_list=[ToolTask(tool_name=tool, input=dict(task_input)) for tool in metadata.tools_required],
+        )
+
+    def _record_path(self, path: str):
+        with self._stats_lock:
+            self._stats[path] += 1
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return dict(self._stats)
+
+    async def build_plan(self, metadata: Metadata, state: ConversationState | None = None) -> ExecutionPlan:
         try:
             logger.info(f"Building execution plan for metadata: {metadata}")
+            if not self._needs_chaining(metadata.tools_required):
+                plan = self.build_direct_plan(metadata)
+                self._record_path("deterministic")
+                logger.info(f"Built execution plan without LLM: {[t.tool_name for t in plan.task_list]}")
+                return plan
+
+            self._record_path("llm")
             context_hint = ""
 
             if state:
@@ -73,7 +121,7 @@ The `input` for each tool should be constructed from the `query`, `entities`, an
 }}
 """.strip()
 
-            raw_output = self.llm_client.run_chat(system_prompt, user_prompt)
+            raw_output = await self.llm_client.arun_chat(system_prompt, user_prompt)
             logger.info(f"Raw output from LLM:\n{raw_output}")
 
             plan_dict = safe_json_parse(raw_output)
@@ -29,14 +29,14 @@ async def main():
         # Step 1: Metadata Extraction
         logger.info("Extracting metadata...")
         metadata_extractor = IntentPipeline()
-        metadata: Metadata = metadata_extractor.run(USER_QUERY)
+        metadata: Metadata = await metadata_extractor.run(USER_QUERY)
         metadata_json = metadata.model_dump_json(indent=2)
         append_to_log(f"Extracted Metadata:\n{metadata_json}")
 
         # Step 2: Planning
         logger.info("Creating execution plan...")
         planner = Planner()
-        plan: ExecutionPlan = planner.build_plan(metadata)
+        plan: ExecutionPlan = await planner.build_plan(metadata)
         plan_json = plan.model_dump_json(indent=2)
         append_to_log(f"Execution Plan:\n{plan_json}")
 
@@ -21,11 +21,11 @@ class TriageClassifier:
             {"type": "function", "function": {"name": "handle_knowledge_query", "description": "Route any query that requires information or an answer from the knowledge base here. This is the default choice.", "parameters": KnowledgeQueryArgs.model_json_schema()}},
         ]
 
-    def classify(self, query: str) -> TriageResult:
+    async def classify(self, query: str) -> TriageResult:
         logger.info(f"[Triage] Classifying query: '{query}'")
         system_prompt = "You are an efficient query routing assistant. Choose the single best function to handle the user's query. Your default choice should be 'handle_knowledge_query' unless it is clearly just small talk."
         
-        response = self.llm_client.run_chat(
+        response = await self.llm_client.acomplete(
             system_prompt,
             query,
             tools=self.tools,
@@ -0,0 +1,73 @@
+import time
+import threading
+
+import pytest
+
+pytest.importorskip("astrapy")
+
+import data.AstraDB as astra_module
+from data.AstraDB import AstraDB
+from utility.IngestionManifest import IngestionManifest, IngestionPlan
+from utility.PDFExtraction import PoolResult
+
+
+class FailingCollection:
+    """Collection stub whose insert_many raises on the `fail_on`-th call."""
+
+    def __init__(self, fail_on: int):
+        self.fail_on = fail_on
+        self.calls = 0
+        self.stored = []
+
+    def insert_many(self, docs, ordered=False):
+        self.calls += 1
+        if self.calls == self.fail_on:
+            raise RuntimeError("insert failed")
+        self.stored.extend(docs)
+
+
+class StubDatabase:
+    def __init__(self, collection):
+        self.collection = collection
+
+    def get_collection(self, name):
+        return self.collection
+
+
+def _slow_imap_unordered(fn, jobs, workers=1, max_pending=None):
+    # Extraction slower than the other stages, so the embed workers sit idle waiting for chunks
+    for key, _ in jobs:
+        time.sleep(0.1)
+        chunks = [{"file_name": key, "text": f"{key} chunk {i}", "metadata": {}} for i in range(3)]
+        yield PoolResult(key=key, value=chunks)
+
+
+@pytest.mark.parametrize("fail_on", [1, 3])
+def test_failed_insert_aborts_pipeline_instead_of_hanging(tmp_path, monkeypatch, fail_on):
+    monkeypatch.setattr(astra_module, "imap_unordered", _slow_imap_unordered)
+    monkeypatch.setattr(astra_module, "INGEST_EMBED_WORKERS", 2)
+
+    collection = FailingCollection(fail_on)
+    db = AstraDB.__new__(AstraDB)
+    db.collection_name = "test"
+    db.database = StubDatabase(collection)
+    db.vectorize_chunks = lambda chunks: [{**chunk, "$vector": [0.0]} for chunk in chunks]
+
+    files = [f"doc{i}.pdf" for i in range(8)]
+    manifest = IngestionManifest("test", directory=str(tmp_path))
+    plan = IngestionPlan(added=files, fingerprints={f: {} for f in files})
+
+    outcome = {}
+
+    def run():
+        try:
+            db._run_pipeline(files, manifest, plan)
+        except BaseException as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(timeout=30)
+
+    assert not thread.is_alive(), "pipeline deadlocked after a failed insert"
+    assert isinstance(outcome.get("error"), RuntimeError)
@@ -0,0 +1,33 @@
+import asyncio
+
+import pytest
+
+import utility.Embedder as embedder
+
+
+class RecordingBackend:
+    """Embeds a text as [len(text)] and records every text it was asked for."""
+
+    name = "recording"
+    native_batching = False
+
+    def __init__(self):
+        self.seen = []
+
+    async def embed(self, texts):
+        self.seen.extend(texts)
+        return [[float(len(text))] for text in texts]
+
+
+@pytest.mark.parametrize("cache_enabled", [True, False])
+def test_repeated_texts_are_embedded_once(monkeypatch, cache_enabled):
+    backend = RecordingBackend()
+    monkeypatch.setattr(embedder, "get_embedding_backend", lambda kind=None: backend)
+    monkeypatch.setattr(embedder, "EMBEDDING_CACHE_ENABLED", cache_enabled)
+    monkeypatch.setattr(embedder, "_embedding_cache", None)
+
+    texts = ["a", "bb", "a", "ccc", "dddd"]
+    vectors = asyncio.run(embedder.embed_batch(texts, batch_size=2))
+
+    assert vectors == [[1.0], [2.0], [1.0], [3.0], [4.0]]
+    assert sorted(backend.seen) == ["a", "bb", "ccc", "dddd"]
@@ -0,0 +1,42 @@
+import time
+import asyncio
+import threading
+
+import pytest
+
+import utility.VectorSearch as vector_search
+
+
+class SlowStore:
+    """similarity_search blocks for `delay` seconds and records how many calls overlap."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.running = 0
+        self.max_running = 0
+        self._lock = threading.Lock()
+
+    def similarity_search(self, query, k):
+        with self._lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(self.delay)
+        with self._lock:
+            self.running -= 1
+        return [query]
+
+
+def test_timed_out_search_keeps_its_slot_until_the_thread_finishes(monkeypatch):
+    monkeypatch.setattr(vector_search, "VECTOR_SEARCH_MAX_CONCURRENCY_PER_COLLECTION", 1)
+    store = SlowStore(delay=0.3)
+
+    async def main():
+        with pytest.raises(asyncio.TimeoutError):
+            await vector_search.search_vector_store("slow", store, "first", k=1, timeout=0.05)
+        # Waits for the abandoned search's thread instead of running next to it
+        return await vector_search.search_vector_store("slow", store, "second", k=1, timeout=5)
+
+    assert asyncio.run(main()) == ["second"]
+    assert store.max_running == 1
+    stats = vector_search.get_vector_search_stats()["slow"]
+    assert stats["timeouts"] == 1 and stats["searches"] == 1 and stats["in_flight"] == 0
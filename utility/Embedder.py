@@ -1,47 +1,408 @@
 import os
+import re
+import json
 import httpx
 import asyncio
+import random
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Set, Tuple
+from utility.async_utils import run_async, LoopLocal
+from utility.SingleFlight import get_singleflight
+from utility.EmbeddingStore import get_embedding_store
+from Logging.logger import logger
 
 EMBEDDING_API_URL = os.getenv(
     "EMBEDDING_API_URL",
     "https://adityapeopleplus-embedding-generator.hf.space/embed"
 )
+EMBEDDING_TIMEOUT_SECONDS = float(os.getenv("EMBEDDING_TIMEOUT_SECONDS", 30.0))
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", 8))
+EMBEDDING_MAX_INFLIGHT_BATCHES = int(os.getenv("EMBEDDING_MAX_INFLIGHT_BATCHES", 4))
+EMBEDDING_MAX_RETRIES = int(os.getenv("EMBEDDING_MAX_RETRIES", 3))
+# "remote" (HF Space at EMBEDDING_API_URL) or "local" (same model on this machine's CPU)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "remote").lower()
+# Single-text requests arriving within the window are embedded as one batch; 0 disables.
+# Only applies to backends that embed a batch in one call (not the one-text-per-request HF Space).
+EMBEDDING_BATCH_WINDOW_MS = float(os.getenv("EMBEDDING_BATCH_WINDOW_MS", 5))
+EMBEDDING_BATCH_MAX_ITEMS = int(os.getenv("EMBEDDING_BATCH_MAX_ITEMS", 32))
+LOCAL_EMBEDDING_MODEL = os.getenv("LOCAL_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+LOCAL_EMBEDDING_WORKERS = int(os.getenv("LOCAL_EMBEDDING_WORKERS", 2))
+LOCAL_EMBEDDING_ONNX = os.getenv("LOCAL_EMBEDDING_ONNX", "false").lower() in ("1", "true", "yes")
+LOCAL_EMBEDDING_ONNX_FILE = os.getenv("LOCAL_EMBEDDING_ONNX_FILE")  # e.g. onnx/model_qint8_avx512.onnx
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", 4096))
 
-async def get_embedding(text: str):
-    """Send text to the HF Space embedding API and return the vector."""
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        resp = await client.post(EMBEDDING_API_URL, json={"text": text})
-        resp.raise_for_status()
-        data = resp.json()
-        return data.get("embedding") or data
 
+def normalize_text(text: str) -> str:
+    """NFC form with whitespace collapsed, so trivially different spellings of a query share one vector."""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", text)).strip()
+
+
+class EmbeddingCache:
+    """In-memory LRU of text -> vector, keyed by a hash of the normalized text and the embedding backend."""
+
+    def __init__(self, max_entries: int = EMBEDDING_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._vectors: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+    @staticmethod
+    def make_key(text: str, backend: str) -> str:
+        return hashlib.sha256(f"{backend}\x00{text}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[List[float]]:
+        with self._lock:
+            vector = self._vectors.get(key)
+            if vector is None:
+                self._stats["misses"] += 1
+                return None
+            self._vectors.move_to_end(key)
+            self._stats["hits"] += 1
+            return list(vector)
+
+    def set(self, key: str, vector: List[float]):
+        with self._lock:
+            self._vectors[key] = list(vector)
+            self._vectors.move_to_end(key)
+            self._stats["writes"] += 1
+            while len(self._vectors) > self.max_entries:
+                self._vectors.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._vectors.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._vectors)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+
+_embedding_cache: Optional[EmbeddingCache] = None
+_embedding_cache_lock = threading.Lock()
+# Concurrent misses on the same text wait for a single API call
+_embedding_flights = get_singleflight("Embedder.get_embedding")
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """Process-wide cache shared by every embedder, or None when disabled via EMBEDDING_CACHE_ENABLED."""
+    global _embedding_cache
+    if not EMBEDDING_CACHE_ENABLED:
+        return None
+    if _embedding_cache is None:
+        with _embedding_cache_lock:
+            if _embedding_cache is None:
+                _embedding_cache = EmbeddingCache()
+    return _embedding_cache
+
+
+def _build_http_client() -> httpx.AsyncClient:
+    # Sized for every request of every in-flight batch, all on kept-alive connections
+    connections = max(1, EMBEDDING_BATCH_SIZE * EMBEDDING_MAX_INFLIGHT_BATCHES)
+    return httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=connections, max_keepalive_connections=connections),
+        timeout=httpx.Timeout(EMBEDDING_TIMEOUT_SECONDS, connect=10.0),
+    )
+
+
+_http_clients = LoopLocal(_build_http_client)
+_RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+async def _request_embedding(text: str):
+    for attempt in range(EMBEDDING_MAX_RETRIES + 1):
+        try:
+            resp = await _http_clients.get().post(EMBEDDING_API_URL, json={"text": text})
+            if resp.status_code not in _RETRY_STATUSES or attempt == EMBEDDING_MAX_RETRIES:
+                resp.raise_for_status()
+                data = resp.json()
+                return data.get("embedding") or data
+            reason = f"HTTP {resp.status_code}"
+        except httpx.TransportError as e:
+            if attempt == EMBEDDING_MAX_RETRIES:
+                raise
+            reason = str(e) or type(e).__name__
+        delay = min(30.0, 2 ** attempt) + random.uniform(0, 1)
+        logger.warning(f"[Embedder] Embedding request failed ({reason}); retrying in {delay:.1f}s")
+        await asyncio.sleep(delay)
+
+
+class RemoteEmbeddingBackend:
+    """The HF Space at EMBEDDING_API_URL, one text per request."""
+
+    # A batch is only concurrent requests, so waiting to fill one would just add latency
+    native_batching = False
 
-def run_async(coro):
-    """Safely run async functions in sync contexts."""
-    try:
+    def __init__(self, api_url: str = EMBEDDING_API_URL):
+        self.name = f"remote:{api_url}"
+
+    async def embed(self, texts: List[str]) -> List[Any]:
+        return list(await asyncio.gather(*(_request_embedding(text) for text in texts)))
+
+    async def warmup(self):
+        await _request_embedding("warmup")
+
+
+class LocalEmbeddingBackend:
+    """
+    The model behind the HF Space (all-MiniLM-L6-v2, 384-D) run on CPU with sentence-transformers.
+    Each batch is encoded in one call on a worker thread, so the event loop stays free.
+    """
+
+    native_batching = True
+
+    def __init__(
+        self,
+        model_name: str = LOCAL_EMBEDDING_MODEL,
+        workers: int = LOCAL_EMBEDDING_WORKERS,
+        onnx: bool = LOCAL_EMBEDDING_ONNX,
+        onnx_file: Optional[str] = LOCAL_EMBEDDING_ONNX_FILE,
+    ):
+        self.model_name = model_name
+        self.onnx = onnx
+        self.onnx_file = onnx_file
+        self.name = f"local:{model_name}"
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="local-embedding")
+        self._model = None
+        self._model_lock = threading.Lock()
+
+    def _load(self):
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    # Optional dependency (requirements-local-embeddings.txt), only needed when EMBEDDING_BACKEND=local
+                    from sentence_transformers import SentenceTransformer
+
+                    kwargs: Dict[str, Any] = {}
+                    if self.onnx:
+                        kwargs["backend"] = "onnx"
+                        if self.onnx_file:
+                            kwargs["model_kwargs"] = {"file_name": self.onnx_file}
+                    logger.info(f"[Embedder] Loading local embedding model {self.model_name} ({'onnx' if self.onnx else 'torch'})")
+                    self._model = SentenceTransformer(self.model_name, device="cpu", **kwargs)
+        return self._model
+
+    def _encode(self, texts: List[str]) -> List[List[float]]:
+        return self._load().encode(texts, batch_size=max(1, len(texts)), convert_to_numpy=True).tolist()
+
+    async def embed(self, texts: List[str]) -> List[Any]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._encode, list(texts))
+
+    async def warmup(self):
+        await self.embed(["warmup"])
+
+
+_backends: Dict[str, Any] = {}
+_backends_lock = threading.Lock()
+
+
+def get_embedding_backend(kind: Optional[str] = None):
+    """Process-wide backend named by `kind`, defaulting to EMBEDDING_BACKEND."""
+    kind = (kind or EMBEDDING_BACKEND).lower()
+    with _backends_lock:
+        if kind not in _backends:
+            if kind == "remote":
+                _backends[kind] = RemoteEmbeddingBackend()
+            elif kind == "local":
+                _backends[kind] = LocalEmbeddingBackend()
+            else:
+                raise ValueError(f"Unknown EMBEDDING_BACKEND '{kind}' (expected 'remote' or 'local')")
+        return _backends[kind]
+
+
+class MicroBatcher:
+    """
+    Collects single-text embedding requests on one event loop for up to `window_ms`, or until
+    `max_items` are waiting, and sends them to the backend as one batch. Each caller gets its
+    own vector (or the batch's exception) back.
+    """
+
+    def __init__(self, backend, window_ms: float = EMBEDDING_BATCH_WINDOW_MS, max_items: int = EMBEDDING_BATCH_MAX_ITEMS):
+        self.backend = backend
+        self.window = window_ms / 1000.0
+        self.max_items = max(1, max_items)
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # The loop only keeps weak references to tasks; an unreferenced one can vanish mid-batch
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def submit(self, text: str):
         loop = asyncio.get_running_loop()
-    except RuntimeError:
-        loop = None
+        future = loop.create_future()
+        self._pending.append((text, future))
+        if len(self._pending) >= self.max_items:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            _record_batch(len(batch))
+            task = asyncio.get_running_loop().create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[str, asyncio.Future]]):
+        try:
+            vectors = await self.backend.embed([text for text, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), vector in zip(batch, vectors):
+            if not future.done():
+                future.set_result(vector)
 
-    if loop and loop.is_running():
-        new_loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(new_loop)
-        result = new_loop.run_until_complete(coro)
-        new_loop.close()
-        return result
-    else:
-        return asyncio.run(coro)
+
+_BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+_batch_stats = {
+    "batches": 0,
+    "items": 0,
+    "max_batch_size": 0,
+    "histogram": {**{f"<={b}": 0 for b in _BATCH_SIZE_BUCKETS}, f">{_BATCH_SIZE_BUCKETS[-1]}": 0},
+}
+_batch_stats_lock = threading.Lock()
+# Futures and timers belong to one loop, so each loop gets its own batcher per backend
+_batchers = LoopLocal(dict)
+
+
+def _record_batch(size: int):
+    bucket = next((f"<={b}" for b in _BATCH_SIZE_BUCKETS if size <= b), f">{_BATCH_SIZE_BUCKETS[-1]}")
+    with _batch_stats_lock:
+        _batch_stats["batches"] += 1
+        _batch_stats["items"] += size
+        _batch_stats["max_batch_size"] = max(_batch_stats["max_batch_size"], size)
+        _batch_stats["histogram"][bucket] += 1
+
+
+def get_embedding_batcher_stats() -> Dict[str, Any]:
+    with _batch_stats_lock:
+        stats = {**_batch_stats, "histogram": dict(_batch_stats["histogram"])}
+    stats["avg_batch_size"] = stats["items"] / stats["batches"] if stats["batches"] else 0.0
+    stats["window_ms"] = EMBEDDING_BATCH_WINDOW_MS
+    stats["max_items"] = EMBEDDING_BATCH_MAX_ITEMS
+    return stats
+
+
+async def _embed_one(backend, text: str):
+    if EMBEDDING_BATCH_WINDOW_MS <= 0 or not backend.native_batching:
+        return (await backend.embed([text]))[0]
+    batchers: Dict[str, MicroBatcher] = _batchers.get()
+    batcher = batchers.get(backend.name)
+    if batcher is None:
+        batcher = batchers[backend.name] = MicroBatcher(backend)
+    return await batcher.submit(text)
+
+
+async def get_embedding(text: str):
+    """Embed one text with the configured backend (served from the cache when possible)."""
+    return (await _embed_texts([text]))[0]
+
+
+async def _embed_texts(texts: List[str]) -> List[Any]:
+    backend = get_embedding_backend()
+    cache = get_embedding_cache()
+    if cache is None:
+        return [await _embed_one(backend, texts[0])] if len(texts) == 1 else await backend.embed(texts)
+
+    # Only the key is normalized: the backend gets the same text whether or not the cache is on
+    keys = [EmbeddingCache.make_key(normalize_text(text), backend.name) for text in texts]
+    vectors: List[Any] = [cache.get(key) for key in keys]
+    missing = [i for i, vector in enumerate(vectors) if vector is None]
+    if not missing:
+        return vectors
+
+    if len(missing) == 1:
+        i = missing[0]
+
+        async def fetch():
+            vector = await _embed_one(backend, texts[i])
+            cache.set(keys[i], vector)
+            return vector
+
+        # Concurrent misses on the same text wait for a single call
+        vectors[i] = list(await _embedding_flights.do(keys[i], fetch))
+        return vectors
+
+    pending: Dict[str, str] = {}
+    for i in missing:
+        pending.setdefault(keys[i], texts[i])
+    fresh = dict(zip(pending, await backend.embed(list(pending.values()))))
+    for key, vector in fresh.items():
+        cache.set(key, vector)
+    return [vector if vector is not None else list(fresh[key]) for vector, key in zip(vectors, keys)]
+
+
+async def embed_batch(
+    texts: List[str],
+    batch_size: int = EMBEDDING_BATCH_SIZE,
+    max_inflight_batches: int = EMBEDDING_MAX_INFLIGHT_BATCHES,
+    use_store: bool = False,
+) -> List[Any]:
+    """
+    Embeds `texts` in batches of `batch_size`, with at most `max_inflight_batches` batches
+    in flight. The remote backend sends a batch as concurrent requests over the shared
+    keep-alive client (the HF Space embeds one text per request); the local backend encodes
+    it in one model call. Repeated texts are embedded once. Vectors come back in input order.
+    With `use_store` (ingestion only; query traffic would grow it without bound), texts already
+    in the on-disk EmbeddingStore are read from it instead of being embedded, and new vectors
+    are added to it.
+    """
+    semaphore = asyncio.Semaphore(max(1, max_inflight_batches))
+    batch_size = max(1, batch_size)
+
+    store = get_embedding_store() if use_store else None
+    backend_name = get_embedding_backend().name
+    keys = [EmbeddingCache.make_key(normalize_text(text), backend_name) for text in texts]
+    vectors = await asyncio.to_thread(store.get_many, keys) if store else [None] * len(texts)
+    # Texts that normalize to the same key are embedded once; `positions` maps each to its slots
+    positions: Dict[str, List[int]] = {}
+    for i, vector in enumerate(vectors):
+        if vector is None:
+            positions.setdefault(keys[i], []).append(i)
+    todo = [slots[0] for slots in positions.values()]
+
+    async def run(batch: List[int]):
+        async with semaphore:
+            return await _embed_texts([texts[i] for i in batch])
+
+    batches = [todo[i:i + batch_size] for i in range(0, len(todo), batch_size)]
+    results = await asyncio.gather(*(run(batch) for batch in batches))
+    for batch, batch_vectors in zip(batches, results):
+        for i, vector in zip(batch, batch_vectors):
+            for slot in positions[keys[i]]:
+                vectors[slot] = vector
+
+    if store and todo:
+        await asyncio.to_thread(store.put_many, [keys[i] for i in todo], [vectors[i] for i in todo])
+    return vectors
 
 
 class HFAPIEmbeddings:
     """Wrapper for Hugging Face embedding API."""
 
+    def __init__(self, use_store: bool = False):
+        # Ingestion turns this on to reuse vectors from the on-disk EmbeddingStore
+        self.use_store = use_store
+
     async def embed_documents(self, texts):
-        embeddings = []
-        for text in texts:
-            vec = await get_embedding(text)
-            embeddings.append(vec)
-        return embeddings
+        return await embed_batch(list(texts), use_store=self.use_store)
 
     def embed_documents_sync(self, texts):
         """Sync wrapper for embedding multiple texts."""
@@ -50,3 +411,70 @@ class HFAPIEmbeddings:
     def embed_query(self, text):
         """Sync single-text embedding for AstraDBVectorStore."""
         return run_async(get_embedding(text))
+
+
+class RemoteHFEmbeddings:
+    """
+    LangChain-style embeddings (sync `embed_*`, async `aembed_*`) over the same HF Space API,
+    for vector stores such as AstraDBVectorStore that call the embedder themselves.
+    """
+
+    def __init__(self, use_store: bool = False):
+        self.use_store = use_store
+
+    async def aembed_documents(self, texts):
+        return await embed_batch(list(texts), use_store=self.use_store)
+
+    async def aembed_query(self, text):
+        return await get_embedding(text)
+
+    def embed_documents(self, texts):
+        return run_async(self.aembed_documents(texts))
+
+    def embed_query(self, text):
+        return run_async(self.aembed_query(text))
+
+
+async def warmup_embeddings():
+    """One embedding call, so a sleeping HF Space is awake (or the local model loaded) before real traffic."""
+    await get_embedding_backend().warmup()
+
+
+def _cosine(a, b) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = (sum(x * x for x in a) ** 0.5) * (sum(y * y for y in b) ** 0.5)
+    return dot / norm if norm else 0.0
+
+
+PARITY_SAMPLE_TEXTS = [
+    "What is the PMEGP scheme and who can apply?",
+    "Am I eligible for a Mudra loan as a woman entrepreneur in Tamil Nadu?",
+    "Export incentives for electronic components under HS code 8532",
+    "Index of Industrial Production growth for manufacturing in 2023",
+    "Credit guarantee cover for micro and small enterprises",
+]
+
+
+async def check_embedding_parity(texts: Optional[List[str]] = None, threshold: float = 0.99) -> Dict[str, Any]:
+    """
+    Embeds `texts` with both backends (bypassing the cache) and compares them per text.
+    The local backend is only a drop-in if every pair's cosine similarity reaches `threshold`.
+    """
+    texts = [normalize_text(text) for text in (texts or PARITY_SAMPLE_TEXTS)]
+    remote = await get_embedding_backend("remote").embed(texts)
+    local = await get_embedding_backend("local").embed(texts)
+
+    similarities = [_cosine(r, l) for r, l in zip(remote, local)]
+    dims = {"remote": len(remote[0]) if remote else 0, "local": len(local[0]) if local else 0}
+    return {
+        "texts": len(texts),
+        "dimensions": dims,
+        "min_cosine": min(similarities) if similarities else None,
+        "mean_cosine": sum(similarities) / len(similarities) if similarities else None,
+        "passed": dims["remote"] == dims["local"] and all(sim >= threshold for sim in similarities),
+    }
+
+
+if __name__ == "__main__":
+    # python -m utility.Embedder  -> compare the local model against the HF Space
+    print(json.dumps(run_async(check_embedding_parity()), indent=2))
@@ -0,0 +1,124 @@
+'''
+EmbeddingStore.py - Persistent, content-addressed store of embedding vectors.
+
+Vectors are appended as raw float32 rows to `vectors.f32` and read back through
+a memory map; a sqlite index maps each content key (see EmbeddingCache.make_key)
+to its row. Re-ingesting an unchanged corpus then reads every chunk's vector
+from disk instead of embedding it again.
+'''
+
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from Logging.logger import logger
+
+EMBEDDING_STORE_ENABLED = os.getenv("EMBEDDING_STORE_ENABLED", "true").lower() in ("1", "true", "yes")
+EMBEDDING_STORE_DIR = os.getenv("EMBEDDING_STORE_DIR", "data/cache/embeddings")
+
+
+class EmbeddingStore:
+    def __init__(self, directory: str = EMBEDDING_STORE_DIR):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.vectors_path = self.directory / "vectors.f32"
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "writes": 0}
+
+        self._db = sqlite3.connect(str(self.directory / "index.sqlite"), check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS embedding_index (key TEXT PRIMARY KEY, row INTEGER NOT NULL)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS embedding_meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        self._db.commit()
+        row = self._db.execute("SELECT value FROM embedding_meta WHERE name = 'dimension'").fetchone()
+        self.dimension: Optional[int] = row[0] if row else None
+        self._rows = self._db.execute("SELECT COUNT(*) FROM embedding_index").fetchone()[0]
+        self._mmap: Optional[np.memmap] = None
+
+    def _matrix(self) -> Optional[np.memmap]:
+        # Caller holds the lock; remap once rows were appended past the current mapping
+        if self.dimension is None or self._rows == 0:
+            return None
+        if self._mmap is None or self._mmap.shape[0] < self._rows:
+            self._mmap = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(self._rows, self.dimension))
+        return self._mmap
+
+    def get_many(self, keys: Sequence[str]) -> List[Optional[List[float]]]:
+        """Stored vector for each key, or None where the key has not been embedded yet."""
+        if not keys:
+            return []
+        with self._lock:
+            rows: Dict[str, int] = {}
+            unique = list(dict.fromkeys(keys))
+            for start in range(0, len(unique), 500):
+                batch = unique[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows.update(self._db.execute(
+                    f"SELECT key, row FROM embedding_index WHERE key IN ({placeholders})", batch
+                ).fetchall())
+            matrix = self._matrix()
+            vectors = [matrix[rows[key]].tolist() if key in rows and matrix is not None else None for key in keys]
+            hits = sum(vector is not None for vector in vectors)
+            self._stats["hits"] += hits
+            self._stats["misses"] += len(vectors) - hits
+            return vectors
+
+    def put_many(self, keys: Sequence[str], vectors: Sequence[Any]):
+        if not keys:
+            return
+        matrix = np.asarray(vectors, dtype=np.float32)
+        with self._lock:
+            if self.dimension is None:
+                self.dimension = int(matrix.shape[1])
+                self._db.execute("INSERT OR REPLACE INTO embedding_meta (name, value) VALUES ('dimension', ?)", (self.dimension,))
+            elif matrix.shape[1] != self.dimension:
+                logger.warning(f"[EmbeddingStore] Not storing {matrix.shape[1]}-D vectors in a {self.dimension}-D store")
+                return
+
+            fresh, seen = [], set()
+            for i, key in enumerate(keys):
+                if key not in seen and self._db.execute("SELECT 1 FROM embedding_index WHERE key = ?", (key,)).fetchone() is None:
+                    seen.add(key)
+                    fresh.append(i)
+            if not fresh:
+                return
+
+            # Vectors first, index second: a crash in between only leaves unreferenced rows
+            with open(self.vectors_path, "ab") as f:
+                f.truncate(self._rows * self.dimension * 4)
+                f.write(matrix[fresh].tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            self._db.executemany(
+                "INSERT INTO embedding_index (key, row) VALUES (?, ?)",
+                [(keys[i], self._rows + n) for n, i in enumerate(fresh)],
+            )
+            self._db.commit()
+            self._rows += len(fresh)
+            self._stats["writes"] += len(fresh)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["vectors"] = self._rows
+            stats["dimension"] = self.dimension
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+
+_stores: Dict[str, EmbeddingStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_embedding_store(directory: str = EMBEDDING_STORE_DIR) -> Optional[EmbeddingStore]:
+    """Process-wide store at `directory`, or None when disabled via EMBEDDING_STORE_ENABLED."""
+    if not EMBEDDING_STORE_ENABLED:
+        return None
+    with _stores_lock:
+        if directory not in _stores:
+            _stores[directory] = EmbeddingStore(directory)
+        return _stores[directory]
@@ -0,0 +1,119 @@
+'''
+IngestionManifest.py - Tracks what an ingestion run has already pushed.
+
+For every document the manifest records its source files (path, size, mtime,
+content hash) and the IDs of the chunks stored for it. Chunk IDs are derived
+from (doc_id, chunk_index, text hash), so re-chunking unchanged text yields the
+same IDs. A run compares the files on disk with the manifest and only adds new
+documents, replaces changed ones and deletes removed ones. Chunks inserted for a
+document that is not finished yet are checkpointed as "partial", so an
+interrupted run resumes without inserting them twice.
+'''
+
+import os
+import json
+import hashlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+INGESTION_MANIFEST_DIR = os.getenv("INGESTION_MANIFEST_DIR", "data/cache/manifests")
+
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def chunk_id(doc_id: str, chunk_index: int, text: str) -> str:
+    """Deterministic ID of a chunk: the same text at the same position always maps to the same ID."""
+    text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    return hashlib.sha256(f"{doc_id}\x00{chunk_index}\x00{text_hash}".encode("utf-8")).hexdigest()[:32]
+
+
+@dataclass
+class IngestionPlan:
+    added: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    # doc_id -> {path: fingerprint} for every document still on disk
+    fingerprints: Dict[str, Dict[str, Dict[str, Any]]] = field(default_factory=dict)
+
+    @property
+    def to_process(self) -> List[str]:
+        return self.added + self.changed
+
+    def summary(self) -> str:
+        lines = [
+            f"{len(self.added)} new, {len(self.changed)} changed, "
+            f"{len(self.removed)} removed, {len(self.unchanged)} unchanged documents"
+        ]
+        for label, doc_ids in (("+", self.added), ("~", self.changed), ("-", self.removed)):
+            lines.extend(f"  {label} {doc_id}" for doc_id in doc_ids)
+        return "\n".join(lines)
+
+
+class IngestionManifest:
+    def __init__(self, name: str, directory: str = INGESTION_MANIFEST_DIR):
+        self.path = Path(directory) / f"{name}.json"
+        self.documents: Dict[str, Dict[str, Any]] = {}
+        self.partial: Dict[str, List[str]] = {}
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.documents = data.get("documents", {})
+            self.partial = data.get("partial", {})
+
+    def _fingerprint(self, path: str, previous: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        stat = os.stat(path)
+        fingerprint = {"size": stat.st_size, "mtime": stat.st_mtime}
+        # Only re-hash files whose size or mtime moved since the last run
+        if previous and previous.get("size") == fingerprint["size"] and previous.get("mtime") == fingerprint["mtime"]:
+            fingerprint["sha256"] = previous["sha256"]
+        else:
+            fingerprint["sha256"] = file_hash(path)
+        return fingerprint
+
+    def plan(self, groups: Dict[str, List[str]]) -> IngestionPlan:
+        """Compare `groups` ({doc_id: [source file paths]}) with what was ingested last time."""
+        plan = IngestionPlan()
+        for doc_id, paths in groups.items():
+            previous_files = self.documents.get(doc_id, {}).get("files", {})
+            fingerprints = {path: self._fingerprint(path, previous_files.get(path)) for path in sorted(paths)}
+            plan.fingerprints[doc_id] = fingerprints
+
+            if doc_id not in self.documents:
+                plan.added.append(doc_id)
+            elif {p: f["sha256"] for p, f in fingerprints.items()} != {p: f["sha256"] for p, f in previous_files.items()}:
+                plan.changed.append(doc_id)
+            else:
+                plan.unchanged.append(doc_id)
+        plan.removed = [doc_id for doc_id in {**self.documents, **self.partial} if doc_id not in groups]
+        return plan
+
+    def chunk_ids(self, doc_id: str) -> List[str]:
+        """IDs currently stored for `doc_id`, including chunks of an unfinished run."""
+        ids = self.documents.get(doc_id, {}).get("chunk_ids", [])
+        return list(dict.fromkeys([*ids, *self.partial.get(doc_id, [])]))
+
+    def mark_inserted(self, doc_id: str, chunk_ids: List[str]):
+        self.partial.setdefault(doc_id, []).extend(chunk_ids)
+
+    def record(self, doc_id: str, fingerprints: Dict[str, Dict[str, Any]], chunk_ids: List[str]):
+        self.documents[doc_id] = {"files": fingerprints, "chunk_ids": chunk_ids}
+        self.partial.pop(doc_id, None)
+
+    def forget(self, doc_id: str):
+        self.documents.pop(doc_id, None)
+        self.partial.pop(doc_id, None)
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"documents": self.documents, "partial": self.partial}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
@@ -1,9 +1,43 @@
 import os
 import re
 import json
-from typing import List, Dict
-from groq import Groq
+import httpx
+import asyncio
+from typing import List, Dict, Any, Callable, Optional
+from groq import AsyncGroq
 import json5
+from utility.async_utils import run_async, LoopLocal
+from utility.LLMCache import LLMCache, get_llm_cache
+from utility.SingleFlight import get_singleflight
+from utility.RateLimiter import LLMScheduler, get_llm_scheduler
+
+GROQ_MAX_CONNECTIONS = int(os.getenv("GROQ_MAX_CONNECTIONS", 100))
+GROQ_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("GROQ_MAX_KEEPALIVE_CONNECTIONS", 20))
+GROQ_TIMEOUT_SECONDS = float(os.getenv("GROQ_TIMEOUT_SECONDS", 60.0))
+
+
+def _build_groq_client() -> AsyncGroq:
+    http_client = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=GROQ_MAX_CONNECTIONS,
+            max_keepalive_connections=GROQ_MAX_KEEPALIVE_CONNECTIONS,
+        ),
+        timeout=httpx.Timeout(GROQ_TIMEOUT_SECONDS, connect=10.0),
+    )
+    # Retries (429, 5xx, timeouts, connection errors) are owned by the LLMScheduler so they count against the shared budgets
+    return AsyncGroq(api_key=os.getenv("GROQ_API_KEY"), http_client=http_client, max_retries=0)
+
+
+# One keep-alive connection pool shared by every LLMClient in the process
+_groq_clients = LoopLocal(_build_groq_client)
+# Identical prompts that are already in flight wait for that completion instead of re-sending it
+_llm_flights = get_singleflight("llm")
+
+
+async def warmup_llm():
+    """Builds this loop's shared Groq client and opens a pooled connection with a free models call."""
+    await _groq_clients.get().models.list()
+
 
 class LLMClient:
     def __init__(self, model: str = "meta-llama/llama-4-maverick-17b-128e-instruct"):
@@ -11,22 +45,102 @@ class LLMClient:
             print("Groq API key is there")
         else:
             print("Cant find Groq API key")
-        self.client = Groq(api_key=os.getenv("GROQ_API_KEY"))
         self.model = model
 
-    def run_chat(self, system_message: str, user_message: str) -> str:
-        """Run a chat completion with the LLM and return the response"""
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": system_message},
-                {"role": "user", "content": user_message}
-            ]
-        )
-        return response.choices[0].message.content.strip()
+    @property
+    def client(self) -> AsyncGroq:
+        return _groq_clients.get()
+
+    async def acomplete(self, system_message: str, user_message: str, **params: Any):
+        """Run a chat completion and return the raw provider response (e.g. for tool calls)."""
+        async def create():
+            return await self.client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": system_message},
+                    {"role": "user", "content": user_message}
+                ],
+                **params
+            )
+
+        tokens = LLMScheduler.estimate_tokens(system_message, user_message, params)
+        return await get_llm_scheduler().run(create, tokens)
+
+    async def _arun_cached(
+        self,
+        system_message: str,
+        user_message: str,
+        cache_ttl: Optional[float],
+        parse: Callable[[str], Any],
+        params: Dict[str, Any],
+    ) -> Any:
+        """
+        Completion text passed through `parse`. With `cache_ttl`, the text is cached only after
+        `parse` accepted it, so a malformed reply is never served again from the cache.
+        """
+        key = LLMCache.make_key(self.model, system_message, user_message, params)
+        cache = get_llm_cache() if cache_ttl else None
+        if cache is not None:
+            # The sqlite tier does blocking I/O
+            cached = await asyncio.to_thread(cache.get, key)
+            if cached is not None:
+                try:
+                    return parse(cached)
+                except Exception:
+                    await asyncio.to_thread(cache.delete, key)
+
+        async def complete() -> str:
+            response = await self.acomplete(system_message, user_message, **params)
+            return response.choices[0].message.content.strip()
 
-    def run_json(self, system_message: str, user_message: str) -> Dict:
-        output = self.run_chat(system_message, user_message)
+        content = await _llm_flights.do(key, complete)
+        result = parse(content)
+        if cache is not None:
+            await asyncio.to_thread(cache.set, key, content, cache_ttl)
+        return result
+
+    async def arun_chat(
+        self,
+        system_message: str,
+        user_message: str,
+        cache_ttl: Optional[float] = None,
+        **params: Any
+    ) -> str:
+        """
+        Run a chat completion with the LLM and return the response.
+        Pass `cache_ttl` (seconds) to serve identical prompts from the shared response cache.
+        """
+        return await self._arun_cached(system_message, user_message, cache_ttl, lambda content: content, params)
+
+    async def arun_json(
+        self,
+        system_message: str,
+        user_message: str,
+        cache_ttl: Optional[float] = None,
+        validate: Optional[Callable[[Dict], Any]] = None,
+        **params: Any
+    ) -> Any:
+        """
+        Run a chat completion and parse its JSON. If `validate` is given (e.g. a Pydantic model's
+        constructor), its result is returned instead, and replies it rejects are not cached.
+        """
+        def parse(content: str) -> Any:
+            data = self.parse_json(content)
+            return validate(data) if validate is not None else data
+
+        return await self._arun_cached(system_message, user_message, cache_ttl, parse, params)
+
+    def complete(self, system_message: str, user_message: str, **params: Any):
+        return run_async(self.acomplete(system_message, user_message, **params))
+
+    def run_chat(self, system_message: str, user_message: str, cache_ttl: Optional[float] = None, **params: Any) -> str:
+        return run_async(self.arun_chat(system_message, user_message, cache_ttl=cache_ttl, **params))
+
+    def run_json(self, system_message: str, user_message: str, cache_ttl: Optional[float] = None, **params: Any) -> Dict:
+        return run_async(self.arun_json(system_message, user_message, cache_ttl=cache_ttl, **params))
+
+    @staticmethod
+    def parse_json(output: str) -> Dict:
         print(f"Raw output from LLM:\n{output}")
 
         # Extract JSON block if in code fences
@@ -48,7 +162,7 @@ class LLMClient:
             print("Problematic JSON string:\n", first_block)
             raise ValueError(f"Failed to parse JSON block.\nError: {e}")
                 
-    def summarize_json_output(self, explanation_json: dict, context: str = None) -> str:
+    async def asummarize_json_output(self, explanation_json: dict, context: str = None) -> str:
         system_prompt = (
             "You are a helpful assistant that explains structured eligibility results in clear, user-friendly language. "
             "Highlight whether the user is eligible or not, and if not, explain why and what is missing."
@@ -65,7 +179,7 @@ class LLMClient:
         """
 
         # Get raw response
-        response = self.run_chat(system_prompt, user_message)
+        response = await self.arun_chat(system_prompt, user_message)
 
         # Extract just the final explanation string
         if isinstance(response, dict):
@@ -79,3 +193,6 @@ class LLMClient:
             return response.strip()
 
         return str(response)
+
+    def summarize_json_output(self, explanation_json: dict, context: str = None) -> str:
+        return run_async(self.asummarize_json_output(explanation_json, context))
@@ -0,0 +1,238 @@
+'''
+LocalIndex.py - In-memory mirror of Astra vector collections.
+
+Each mirrored collection is held in RAM as a normalized float32 matrix and
+searched exactly with NumPy, or through an HNSW graph (hnswlib, optional) once
+it grows past LOCAL_INDEX_EXACT_MAX documents. The mirror starts from an on-disk
+snapshot and a background thread pulls deltas from Astra every
+LOCAL_INDEX_SYNC_INTERVAL seconds: the id list is compared with the local one
+and only new documents are fetched, removed ones dropped. Callers fall back to
+Astra whenever a mirror is not ready.
+'''
+
+import os
+import json
+import time
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from astrapy import DataAPIClient
+from langchain_core.documents import Document
+
+from Logging.logger import logger
+
+try:
+    import hnswlib
+except ImportError:  # exact search only
+    hnswlib = None
+
+LOCAL_INDEX_ENABLED = os.getenv("LOCAL_INDEX_ENABLED", "true").lower() in ("1", "true", "yes")
+LOCAL_INDEX_DIR = Path(os.getenv("LOCAL_INDEX_DIR", "data/cache/vector_index"))
+LOCAL_INDEX_SYNC_INTERVAL = float(os.getenv("LOCAL_INDEX_SYNC_INTERVAL", 300))
+LOCAL_INDEX_EXACT_MAX = int(os.getenv("LOCAL_INDEX_EXACT_MAX", 50000))
+_FETCH_BATCH = 100  # Data API limit for $in
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+class _IndexState:
+    """Immutable snapshot of one collection; searches read it while a sync builds the next one."""
+
+    def __init__(self, ids: List[str], docs: List[Tuple[str, Dict[str, Any]]], matrix: np.ndarray, collection_name: str = ""):
+        self.ids = ids
+        self.docs = docs
+        self.matrix = matrix
+        self.graph = None
+        if len(ids) > LOCAL_INDEX_EXACT_MAX and hnswlib is None:
+            logger.warning(
+                f"[LocalIndex] '{collection_name}' has {len(ids)} documents (> LOCAL_INDEX_EXACT_MAX={LOCAL_INDEX_EXACT_MAX}) "
+                "but hnswlib is not installed; searching it exactly, which gets slower as it grows"
+            )
+        elif len(ids) > LOCAL_INDEX_EXACT_MAX:
+            self.graph = hnswlib.Index(space="ip", dim=matrix.shape[1])
+            self.graph.init_index(max_elements=len(ids), ef_construction=200, M=16)
+            self.graph.add_items(matrix, np.arange(len(ids)))
+
+    def search(self, vector: np.ndarray, k: int) -> List[Tuple[int, float]]:
+        k = min(k, len(self.ids))
+        if k <= 0:
+            return []
+        if self.graph is not None:
+            self.graph.set_ef(max(64, 2 * k))
+            labels, distances = self.graph.knn_query(vector, k=k)
+            # "ip" distance is 1 - dot product
+            return [(int(i), float(1.0 - d)) for i, d in zip(labels[0], distances[0])]
+        scores = self.matrix @ vector.ravel()
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(i), float(scores[i])) for i in top]
+
+
+class LocalVectorIndex:
+    def __init__(self, collection_name: str, api_endpoint: str, token: str, snapshot_dir: Path = LOCAL_INDEX_DIR):
+        self.collection_name = collection_name
+        self.api_endpoint = api_endpoint
+        self.token = token
+        self.snapshot_path = Path(snapshot_dir) / f"{collection_name}.npz"
+        self._state: Optional[_IndexState] = None
+        self._collection = None
+        self._sync_lock = threading.Lock()
+        self._stats = {"local_searches": 0, "syncs": 0, "sync_failures": 0, "added": 0, "removed": 0, "last_sync": None}
+
+    @property
+    def ready(self) -> bool:
+        return self._state is not None and len(self._state.ids) > 0
+
+    def _astra_collection(self):
+        if self._collection is None:
+            client = DataAPIClient(self.token)
+            db = client.get_database(self.api_endpoint, keyspace=os.getenv("ASTRA_DB_KEYSPACE"))
+            self._collection = db.get_collection(self.collection_name)
+        return self._collection
+
+    def load_snapshot(self) -> bool:
+        if not self.snapshot_path.exists():
+            return False
+        try:
+            with np.load(self.snapshot_path, allow_pickle=False) as data:
+                ids = [str(i) for i in data["ids"]]
+                docs = [tuple(doc) for doc in json.loads(str(data["docs"]))]
+                matrix = data["matrix"].astype(np.float32)
+            self._state = _IndexState(ids, docs, matrix, self.collection_name)
+            logger.info(f"[LocalIndex] Loaded {len(ids)} documents for '{self.collection_name}' from snapshot")
+            return True
+        except Exception as e:
+            logger.warning(f"[LocalIndex] Could not load snapshot for '{self.collection_name}': {e}")
+            return False
+
+    def _save_snapshot(self, state: _IndexState):
+        self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.snapshot_path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(f, ids=np.array(state.ids, dtype=str), docs=np.array(json.dumps(state.docs, default=str)), matrix=state.matrix)
+        os.replace(tmp_path, self.snapshot_path)
+
+    def sync(self):
+        """Pull the documents added to or removed from Astra since the last sync."""
+        with self._sync_lock:
+            try:
+                collection = self._astra_collection()
+                remote_ids = [str(doc["_id"]) for doc in collection.find({}, projection={"_id": True})]
+
+                current = self._state
+                known = {doc_id: i for i, doc_id in enumerate(current.ids)} if current else {}
+                remote_set = set(remote_ids)
+                missing = [doc_id for doc_id in remote_ids if doc_id not in known]
+                removed = len(known) - sum(1 for doc_id in known if doc_id in remote_set)
+
+                if not missing and not removed and current is not None:
+                    self._stats["last_sync"] = time.time()
+                    self._stats["syncs"] += 1
+                    return
+
+                fetched: Dict[str, Tuple[Tuple[str, Dict[str, Any]], List[float]]] = {}
+                for start in range(0, len(missing), _FETCH_BATCH):
+                    batch = missing[start:start + _FETCH_BATCH]
+                    for doc in collection.find({"_id": {"$in": batch}}, projection={"*": True}):
+                        vector = doc.get("$vector")
+                        if vector is None:
+                            continue
+                        content = doc.get("content") or doc.get("text") or ""
+                        fetched[str(doc["_id"])] = ((content, doc.get("metadata") or {}), vector)
+
+                ids, docs, rows = [], [], []
+                for doc_id in remote_ids:
+                    if doc_id in known:
+                        ids.append(doc_id)
+                        docs.append(current.docs[known[doc_id]])
+                        rows.append(current.matrix[known[doc_id]])
+                    elif doc_id in fetched:
+                        (content, metadata), vector = fetched[doc_id]
+                        ids.append(doc_id)
+                        docs.append((content, metadata))
+                        rows.append(np.asarray(vector, dtype=np.float32))
+
+                matrix = _normalize_rows(np.stack(rows)) if rows else np.empty((0, 0), dtype=np.float32)
+                state = _IndexState(ids, docs, matrix.astype(np.float32), self.collection_name)
+                self._state = state
+                self._save_snapshot(state)
+
+                self._stats["added"] += len(fetched)
+                self._stats["removed"] += removed
+                self._stats["syncs"] += 1
+                self._stats["last_sync"] = time.time()
+                logger.info(f"[LocalIndex] '{self.collection_name}' synced: +{len(fetched)} -{removed} ({len(ids)} total)")
+            except Exception as e:
+                self._stats["sync_failures"] += 1
+                logger.warning(f"[LocalIndex] Sync of '{self.collection_name}' failed: {e}")
+
+    def search(self, query_vector: List[float], k: int) -> List[Document]:
+        state = self._state
+        if state is None or not state.ids:
+            raise LookupError(f"Local index for '{self.collection_name}' is empty")
+        vector = _normalize_rows(np.asarray(query_vector, dtype=np.float32))
+        if vector.shape[-1] != state.matrix.shape[1]:
+            raise ValueError(f"Query vector has {vector.shape[-1]} dims, index '{self.collection_name}' has {state.matrix.shape[1]}")
+
+        self._stats["local_searches"] += 1
+        results = []
+        # Same shape as AstraDBVectorStore.similarity_search results
+        for i, _ in state.search(vector, k):
+            content, metadata = state.docs[i]
+            results.append(Document(page_content=content, metadata=metadata))
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        state = self._state
+        return {
+            **self._stats,
+            "documents": len(state.ids) if state else 0,
+            "mode": ("hnsw" if state.graph is not None else "exact") if state else None,
+        }
+
+
+_indexes: Dict[str, LocalVectorIndex] = {}
+_indexes_lock = threading.Lock()
+_sync_thread: Optional[threading.Thread] = None
+
+
+def get_local_index(collection_name: str, api_endpoint: str, token: str) -> Optional[LocalVectorIndex]:
+    """Process-wide mirror of the Astra collection `collection_name`, or None when LOCAL_INDEX_ENABLED is off."""
+    if not LOCAL_INDEX_ENABLED:
+        return None
+    with _indexes_lock:
+        if collection_name not in _indexes:
+            index = LocalVectorIndex(collection_name, api_endpoint, token)
+            index.load_snapshot()
+            _indexes[collection_name] = index
+        return _indexes[collection_name]
+
+
+def _sync_forever():
+    while True:
+        with _indexes_lock:
+            indexes = list(_indexes.values())
+        for index in indexes:
+            index.sync()
+        time.sleep(LOCAL_INDEX_SYNC_INTERVAL)
+
+
+def start_background_sync():
+    """Starts the daemon thread that keeps every mirror in step with Astra (first pass runs immediately)."""
+    global _sync_thread
+    if not LOCAL_INDEX_ENABLED:
+        return
+    with _indexes_lock:
+        if _sync_thread is None:
+            _sync_thread = threading.Thread(target=_sync_forever, name="local-index-sync", daemon=True)
+            _sync_thread.start()
+
+
+def get_local_index_stats() -> Dict[str, Dict[str, Any]]:
+    with _indexes_lock:
+        return {name: index.get_stats() for name, index in _indexes.items()}
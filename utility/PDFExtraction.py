@@ -0,0 +1,168 @@
+'''
+PDFExtraction.py - PDF text extraction and chunking on a process pool.
+
+Parsing PDFs and splitting their text is CPU-bound, so ingestion scripts fan it
+out over PDF_WORKERS processes with `imap_unordered` and consume results in
+completion order. Each job is timed in its worker; failures are reported per
+job instead of aborting the whole run. Parsed text goes through the TextCache,
+so re-runs (or new chunk sizes) skip PDF parsing for files seen before. The worker functions live here (and
+import their parsers lazily) so spawned workers only import this module; a
+calling script must still keep expensive setup out of its import-time code.
+'''
+
+import os
+import time
+from dataclasses import dataclass
+from multiprocessing import get_context
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from Logging.logger import logger
+from utility.TextCache import cached_extract
+
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", os.cpu_count() or 1))
+
+DEFAULT_SEPARATORS = ["\n\n", ".", "!", "?"]
+
+
+def _pypdf_pages(file_path: str) -> List[Dict[str, Any]]:
+    from langchain_community.document_loaders import PyPDFLoader
+
+    return [{"text": page.page_content, "metadata": page.metadata} for page in PyPDFLoader(file_path).lazy_load()]
+
+
+def iter_pdf_chunks(
+    file_path: str,
+    chunk_size: int = 500,
+    chunk_overlap: int = 100,
+    separators: Optional[List[str]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yields the chunks of a PDF (PyPDFLoader pages + RecursiveCharacterTextSplitter). The parsed
+    pages are extracted, or read back from the TextCache, as a whole, so the text of the entire
+    PDF is in memory while its chunks are yielded.
+    """
+    from langchain_core.documents import Document
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        separators=separators or DEFAULT_SEPARATORS,
+    )
+    for page in cached_extract(file_path, "pypdf", _pypdf_pages):
+        # Cached by content, so the entry may come from a copy of this file elsewhere
+        metadata = {**page["metadata"], "source": file_path}
+        for doc in splitter.split_documents([Document(page_content=page["text"], metadata=metadata)]):
+            yield {
+                "file_name": os.path.basename(file_path),
+                "text": doc.page_content.strip(),
+                "metadata": doc.metadata,
+            }
+
+
+def chunk_pdf(file_path: str, chunk_size: int = 500, chunk_overlap: int = 100) -> List[Dict[str, Any]]:
+    """All chunks of a PDF as one list: what a pool worker pickles back for the file."""
+    return list(iter_pdf_chunks(file_path, chunk_size, chunk_overlap))
+
+
+def _pymupdf_text(path: str) -> str:
+    import fitz
+
+    with fitz.open(path) as doc:
+        return "\n".join(page.get_text() for page in doc)
+
+
+def extract_text(path: str) -> str:
+    """Plain text of a PDF (PyMuPDF, through the TextCache) or text file."""
+    if path.lower().endswith(".pdf"):
+        return cached_extract(path, "pymupdf", _pymupdf_text)
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def extract_and_split(paths: List[str], chunk_size: int = 700, chunk_overlap: int = 100) -> List[str]:
+    """Joins the text of `paths` and splits it with RecursiveCharacterTextSplitter."""
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+    text = "".join("\n" + extract_text(path) for path in paths)
+    if not text.strip():
+        return []
+    return RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap).split_text(text)
+
+
+@dataclass
+class PoolResult:
+    key: Any
+    value: Any = None
+    error: Optional[str] = None
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _timed(fn: Callable, args: Tuple) -> Tuple[Any, Optional[str], float]:
+    started = time.perf_counter()
+    try:
+        return fn(*args), None, time.perf_counter() - started
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}", time.perf_counter() - started
+
+
+def imap_unordered(
+    fn: Callable,
+    jobs: Iterable[Tuple[Any, Tuple]],
+    workers: int = PDF_WORKERS,
+    max_pending: Optional[int] = None,
+) -> Iterator[PoolResult]:
+    """
+    Runs `fn(*args)` for every `(key, args)` in `jobs` on a process pool and yields a PoolResult
+    as each one finishes. At most `max_pending` jobs (default 2 x workers) are submitted at a
+    time, so finished results never pile up faster than the caller consumes them.
+    """
+    workers = max(1, workers)
+    max_pending = max_pending or 2 * workers
+    jobs = iter(jobs)
+    pending: Dict[Future, Any] = {}
+    succeeded, failed, worker_seconds = 0, 0, 0.0
+    started = time.perf_counter()
+
+    # spawn: callers (e.g. the ingestion pipeline) already run threads, which fork does not mix with
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"))
+
+    def submit_more():
+        while len(pending) < max_pending:
+            try:
+                key, args = next(jobs)
+            except StopIteration:
+                return
+            pending[pool.submit(_timed, fn, args)] = key
+
+    try:
+        submit_more()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                key = pending.pop(future)
+                try:
+                    value, error, seconds = future.result()
+                except Exception as e:  # e.g. a worker process died
+                    value, error, seconds = None, f"{type(e).__name__}: {e}", 0.0
+                worker_seconds += seconds
+                if error is None:
+                    succeeded += 1
+                    logger.info(f"[PDFExtraction] {key} done in {seconds:.2f}s")
+                else:
+                    failed += 1
+                    logger.error(f"[PDFExtraction] {key} failed after {seconds:.2f}s: {error}")
+                yield PoolResult(key=key, value=value, error=error, seconds=seconds)
+            submit_more()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+        elapsed = time.perf_counter() - started
+        logger.info(
+            f"[PDFExtraction] {succeeded} succeeded, {failed} failed in {elapsed:.1f}s "
+            f"({worker_seconds:.1f}s of work on {workers} workers)"
+        )
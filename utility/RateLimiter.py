@@ -0,0 +1,300 @@
+'''
+RateLimiter.py - Process-wide scheduler in front of every LLM call.
+
+Requests wait in line until both the requests-per-minute and tokens-per-minute
+buckets have room and a concurrency slot is free. 429 responses are retried
+after the provider's retry-after hint; timeouts, connection errors and 5xx/408/409
+responses with exponential backoff. The concurrency limit grows while
+latency stays near its baseline and shrinks when latency climbs or the provider
+starts rejecting requests.
+'''
+
+import os
+import time
+import random
+import asyncio
+import threading
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+from Logging.logger import logger
+
+T = TypeVar("T")
+
+# 0 (the default) disables a bucket and leaves pacing to 429 handling. Set them to the
+# account's limits (e.g. 30 and 6000 on Groq's free tier) to queue before being rejected.
+GROQ_REQUESTS_PER_MINUTE = float(os.getenv("GROQ_REQUESTS_PER_MINUTE", 0))
+GROQ_TOKENS_PER_MINUTE = float(os.getenv("GROQ_TOKENS_PER_MINUTE", 0))
+GROQ_MIN_CONCURRENCY = int(os.getenv("GROQ_MIN_CONCURRENCY", 1))
+GROQ_INITIAL_CONCURRENCY = int(os.getenv("GROQ_INITIAL_CONCURRENCY", 4))
+GROQ_MAX_CONCURRENCY = int(os.getenv("GROQ_MAX_CONCURRENCY", 16))
+GROQ_MAX_RETRIES = int(os.getenv("GROQ_MAX_RETRIES", 5))
+# Completion tokens reserved up front when a call does not set max_tokens
+DEFAULT_COMPLETION_TOKENS = int(os.getenv("GROQ_DEFAULT_COMPLETION_TOKENS", 512))
+
+_WAIT_SAMPLES = 1000
+
+
+class TokenBucket:
+    """Refills continuously at `per_minute / 60` units per second up to `per_minute`."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.level = per_minute
+        self._updated = time.monotonic()
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def time_until(self, amount: float, now: float) -> float:
+        """Seconds until `amount` can be taken (0 if available now). Caller holds the scheduler lock."""
+        if not self.enabled:
+            return 0.0
+        self._refill(now)
+        # A single request larger than the whole bucket goes through once the bucket is full
+        amount = min(amount, self.capacity)
+        return max(0.0, (amount - self.level) / self.rate)
+
+    def take(self, amount: float):
+        if self.enabled:
+            self.level -= min(amount, self.capacity)
+
+    def adjust(self, delta: float):
+        """Correct an earlier reservation once the real usage is known (may leave the bucket in debt)."""
+        if self.enabled:
+            self.level = min(self.capacity, self.level - delta)
+
+
+class LLMScheduler:
+    def __init__(
+        self,
+        requests_per_minute: float = GROQ_REQUESTS_PER_MINUTE,
+        tokens_per_minute: float = GROQ_TOKENS_PER_MINUTE,
+        min_concurrency: int = GROQ_MIN_CONCURRENCY,
+        initial_concurrency: int = GROQ_INITIAL_CONCURRENCY,
+        max_concurrency: int = GROQ_MAX_CONCURRENCY,
+        max_retries: int = GROQ_MAX_RETRIES,
+        latency_tolerance: float = 2.0,
+    ):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.min_concurrency = max(1, min_concurrency)
+        self.max_concurrency = max(self.min_concurrency, max_concurrency)
+        self.max_retries = max_retries
+        self.latency_tolerance = latency_tolerance
+
+        # Lives outside any one event loop: sync callers spin up their own loops via run_async
+        self._lock = threading.Lock()
+        self._limit = float(min(self.max_concurrency, max(self.min_concurrency, initial_concurrency)))
+        self._in_flight = 0
+        self._queued = 0
+        self._paused_until = 0.0
+        self._latency_ewma: Optional[float] = None
+        self._latency_baseline: Optional[float] = None
+        self._waits: deque = deque(maxlen=_WAIT_SAMPLES)
+        # Futures of callers waiting for a concurrency slot, each tied to its own event loop
+        self._slot_waiters: List[asyncio.Future] = []
+        self._stats = {
+            "requests": 0,
+            "retries": 0,
+            "rate_limited": 0,
+            "failures": 0,
+            "max_queue_depth": 0,
+        }
+
+    @staticmethod
+    def estimate_tokens(system_message: str, user_message: str, params: Dict[str, Any]) -> int:
+        # ~4 characters per token for English prompts, plus the completion budget
+        prompt_tokens = (len(system_message) + len(user_message)) // 4
+        return prompt_tokens + int(params.get("max_tokens") or DEFAULT_COMPLETION_TOKENS)
+
+    async def _acquire(self, tokens: int) -> float:
+        queued_at = time.monotonic()
+        with self._lock:
+            self._queued += 1
+            self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], self._queued)
+        try:
+            while True:
+                slot_freed = None
+                with self._lock:
+                    now = time.monotonic()
+                    wait = max(
+                        self._paused_until - now,
+                        self.requests.time_until(1, now),
+                        self.tokens.time_until(tokens, now),
+                    )
+                    if wait <= 0:
+                        if self._in_flight < int(self._limit):
+                            self.requests.take(1)
+                            self.tokens.take(tokens)
+                            self._in_flight += 1
+                            waited = now - queued_at
+                            self._waits.append(waited)
+                            return waited
+                        # Registered under the lock, so a release in between cannot be missed
+                        slot_freed = asyncio.get_running_loop().create_future()
+                        self._slot_waiters.append(slot_freed)
+                if slot_freed is None:
+                    # Bucket waits are exact; a 429 pause may still extend it, so check again after
+                    await asyncio.sleep(wait)
+                    continue
+                try:
+                    await slot_freed
+                finally:
+                    with self._lock:
+                        if slot_freed in self._slot_waiters:
+                            self._slot_waiters.remove(slot_freed)
+        finally:
+            with self._lock:
+                self._queued -= 1
+
+    @staticmethod
+    def _wake(future: asyncio.Future):
+        if not future.done():
+            future.set_result(None)
+
+    def _notify_waiters(self):
+        # Caller holds the lock. Every waiter re-checks, since they may sit on different loops.
+        waiters, self._slot_waiters = self._slot_waiters, []
+        for future in waiters:
+            try:
+                future.get_loop().call_soon_threadsafe(self._wake, future)
+            except RuntimeError:  # that loop is already closed
+                pass
+
+    def _release(self, latency: Optional[float], reserved_tokens: int, used_tokens: Optional[int]):
+        with self._lock:
+            self._in_flight -= 1
+            self._notify_waiters()
+            if used_tokens is not None:
+                self.tokens.adjust(used_tokens - reserved_tokens)
+            if latency is None:
+                return
+
+            self._latency_ewma = latency if self._latency_ewma is None else 0.8 * self._latency_ewma + 0.2 * latency
+            # Baseline tracks the best latency seen, drifting up slowly so it can follow a slower model/provider
+            if self._latency_baseline is None or self._latency_ewma < self._latency_baseline:
+                self._latency_baseline = self._latency_ewma
+            else:
+                self._latency_baseline *= 1.01
+
+            if self._latency_ewma > self._latency_baseline * self.latency_tolerance:
+                self._limit = max(self.min_concurrency, self._limit * 0.9)
+            elif self._in_flight + 1 >= int(self._limit):
+                # Only grow while the current limit is actually being used
+                self._limit = min(self.max_concurrency, self._limit + 1.0 / self._limit)
+
+    def _on_rate_limited(self, retry_after: float):
+        with self._lock:
+            self._stats["rate_limited"] += 1
+            self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+            self._limit = max(self.min_concurrency, self._limit / 2)
+
+    @staticmethod
+    def _retry_after(error: Exception, attempt: int) -> float:
+        headers = getattr(getattr(error, "response", None), "headers", None) or {}
+        for header, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+            value = headers.get(header)
+            if value:
+                try:
+                    return float(value) * scale
+                except ValueError:
+                    pass
+        return min(60.0, 2 ** attempt) + random.uniform(0, 1)
+
+    @staticmethod
+    def _is_transient(error: Exception) -> bool:
+        """Errors the Groq SDK would retry itself: timeouts, connection errors, 408/409 and 5xx."""
+        from groq import APIConnectionError, APIStatusError
+
+        if isinstance(error, APIConnectionError):  # includes APITimeoutError
+            return True
+        return isinstance(error, APIStatusError) and (error.status_code in (408, 409) or error.status_code >= 500)
+
+    async def run(self, fn: Callable[[], Awaitable[T]], tokens: int) -> T:
+        """Runs `fn` once the buckets and concurrency limit allow it, retrying on 429 and transient errors."""
+        # Imported here so the scheduler itself has no hard dependency on the Groq SDK
+        from groq import APIError, RateLimitError
+
+        with self._lock:
+            self._stats["requests"] += 1
+
+        for attempt in range(self.max_retries + 1):
+            await self._acquire(tokens)
+            started = time.monotonic()
+            try:
+                result = await fn()
+            except RateLimitError as e:
+                self._release(None, tokens, None)
+                if attempt == self.max_retries:
+                    with self._lock:
+                        self._stats["failures"] += 1
+                    raise
+                delay = self._retry_after(e, attempt)
+                logger.warning(f"[LLMScheduler] Rate limited, retrying in {delay:.1f}s (attempt {attempt + 1}/{self.max_retries})")
+                self._on_rate_limited(delay)
+                with self._lock:
+                    self._stats["retries"] += 1
+                continue
+            except APIError as e:
+                self._release(None, tokens, None)
+                if not self._is_transient(e) or attempt == self.max_retries:
+                    with self._lock:
+                        self._stats["failures"] += 1
+                    raise
+                # Only this call backs off; unlike a 429, one failed request says nothing about the budgets
+                delay = self._retry_after(e, attempt)
+                logger.warning(f"[LLMScheduler] {type(e).__name__}, retrying in {delay:.1f}s (attempt {attempt + 1}/{self.max_retries})")
+                with self._lock:
+                    self._stats["retries"] += 1
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                self._release(None, tokens, None)
+                with self._lock:
+                    self._stats["failures"] += 1
+                raise
+
+            usage = getattr(result, "usage", None)
+            self._release(time.monotonic() - started, tokens, getattr(usage, "total_tokens", None))
+            return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            waits = sorted(self._waits)
+            stats = dict(self._stats)
+            stats.update({
+                "queue_depth": self._queued,
+                "in_flight": self._in_flight,
+                "concurrency_limit": int(self._limit),
+                "latency_ewma_seconds": self._latency_ewma,
+                "latency_baseline_seconds": self._latency_baseline,
+                "requests_available": self.requests.level if self.requests.enabled else None,
+                "tokens_available": self.tokens.level if self.tokens.enabled else None,
+            })
+        stats["wait_seconds"] = {
+            "avg": sum(waits) / len(waits) if waits else 0.0,
+            "p95": waits[int(0.95 * (len(waits) - 1))] if waits else 0.0,
+            "max": waits[-1] if waits else 0.0,
+        }
+        return stats
+
+
+_scheduler: Optional[LLMScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_llm_scheduler() -> LLMScheduler:
+    """The single scheduler every LLMClient in the process goes through."""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = LLMScheduler()
+    return _scheduler
@@ -0,0 +1,59 @@
+'''
+SingleFlight.py - Coalesces identical concurrent async calls.
+
+While a call for a key is in flight, further callers with the same key await the
+same task instead of issuing a duplicate request. The shared work runs as its own
+task, so a caller that gets cancelled (e.g. a client disconnect) does not cancel
+it for everyone else.
+'''
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+_groups: Dict[str, "SingleFlight"] = {}
+_groups_lock = threading.Lock()
+
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._stats = {"calls": 0, "executed": 0, "deduplicated": 0}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        loop = asyncio.get_running_loop()
+        self._stats["calls"] += 1
+
+        task = self._inflight.get(key)
+        if task is not None and task.get_loop() is loop:
+            self._stats["deduplicated"] += 1
+        else:
+            task = loop.create_task(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+            self._stats["executed"] += 1
+
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self._stats, "in_flight": len(self._inflight)}
+
+
+def get_singleflight(name: str) -> SingleFlight:
+    """Process-wide group per name, so counters from every caller end up in one place."""
+    with _groups_lock:
+        if name not in _groups:
+            _groups[name] = SingleFlight(name)
+        return _groups[name]
+
+
+def get_singleflight_stats() -> Dict[str, Dict[str, Any]]:
+    with _groups_lock:
+        return {name: group.get_stats() for name, group in _groups.items()}
@@ -0,0 +1,97 @@
+'''
+TextCache.py - Compressed cache of text extracted from PDFs.
+
+Extraction output is stored gzip-compressed under TEXT_CACHE_DIR, keyed by the
+file's content hash and the extractor that produced it (PyMuPDF text and
+PyPDFLoader pages differ). A renamed or copied file hits the same entry, an
+edited one misses. Entries are written atomically, so the worker processes of a
+parallel extraction can share the cache.
+'''
+
+import os
+import gzip
+import json
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from Logging.logger import logger
+from utility.IngestionManifest import file_hash
+
+TEXT_CACHE_ENABLED = os.getenv("TEXT_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+TEXT_CACHE_DIR = os.getenv("TEXT_CACHE_DIR", "data/cache/text")
+
+
+class TextCache:
+    def __init__(self, directory: str = TEXT_CACHE_DIR):
+        self.directory = Path(directory)
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "writes": 0}
+
+    def _path(self, digest: str, extractor: str) -> Path:
+        return self.directory / digest[:2] / f"{digest}.{extractor}.json.gz"
+
+    def get(self, digest: str, extractor: str) -> Optional[Any]:
+        path = self._path(digest, extractor)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                value = json.load(f)
+        except (FileNotFoundError, OSError, ValueError):
+            with self._lock:
+                self._stats["misses"] += 1
+            return None
+        with self._lock:
+            self._stats["hits"] += 1
+        return value
+
+    def set(self, digest: str, extractor: str, value: Any):
+        """Stores `value`; a failed write (disk full, unserializable metadata, ...) only logs a warning."""
+        path = self._path(digest, extractor)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+                json.dump(value, f)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"[TextCache] Could not cache {extractor} text of {digest[:12]}: {e}")
+            tmp_path.unlink(missing_ok=True)
+            return
+        with self._lock:
+            self._stats["writes"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+
+_text_cache: Optional[TextCache] = None
+_text_cache_lock = threading.Lock()
+
+
+def get_text_cache() -> Optional[TextCache]:
+    """Process-wide cache, or None when disabled via TEXT_CACHE_ENABLED."""
+    global _text_cache
+    if not TEXT_CACHE_ENABLED:
+        return None
+    if _text_cache is None:
+        with _text_cache_lock:
+            if _text_cache is None:
+                _text_cache = TextCache()
+    return _text_cache
+
+
+def cached_extract(path: str, extractor: str, extract: Callable[[str], Any]) -> Any:
+    """`extract(path)`, served from the cache when this file's content was extracted before."""
+    cache = get_text_cache()
+    if cache is None:
+        return extract(path)
+    digest = file_hash(path)
+    value = cache.get(digest, extractor)
+    if value is None:
+        value = extract(path)
+        cache.set(digest, extractor, value)
+    return value
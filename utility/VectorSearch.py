@@ -0,0 +1,109 @@
+'''
+VectorSearch.py - Runs blocking vector store searches off the event loop.
+
+AstraDBVectorStore.similarity_search is synchronous (embedding request + Astra
+round-trip). Every MCP app shares one event loop in Servers/main.py, so searches
+run on a bounded thread pool, with a per-collection concurrency limit and a
+timeout, and never stall unrelated traffic. search_collection tries the
+collection's in-memory mirror (utility/LocalIndex.py) first and only goes to
+Astra when the mirror is missing, not ready or fails.
+'''
+
+import os
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from utility.async_utils import LoopLocal
+from Logging.logger import logger
+
+VECTOR_SEARCH_MAX_WORKERS = int(os.getenv("VECTOR_SEARCH_MAX_WORKERS", 16))
+VECTOR_SEARCH_MAX_CONCURRENCY_PER_COLLECTION = int(os.getenv("VECTOR_SEARCH_MAX_CONCURRENCY_PER_COLLECTION", 4))
+VECTOR_SEARCH_TIMEOUT_SECONDS = float(os.getenv("VECTOR_SEARCH_TIMEOUT_SECONDS", 20.0))
+
+_executor = ThreadPoolExecutor(max_workers=VECTOR_SEARCH_MAX_WORKERS, thread_name_prefix="vector-search")
+# asyncio semaphores belong to one loop, so each loop gets its own per-collection set
+_semaphores: LoopLocal = LoopLocal(dict)
+_stats: Dict[str, Dict[str, Any]] = {}
+_stats_lock = threading.Lock()
+
+
+def _collection_stats(collection_name: str) -> Dict[str, Any]:
+    # Caller holds _stats_lock
+    return _stats.setdefault(collection_name, {"searches": 0, "timeouts": 0, "errors": 0, "in_flight": 0, "total_seconds": 0.0})
+
+
+async def search_vector_store(
+    collection_name: str,
+    store: Any,
+    query: str,
+    k: int,
+    timeout: float = VECTOR_SEARCH_TIMEOUT_SECONDS,
+) -> List[Any]:
+    """`store.similarity_search(query, k)` on the shared thread pool, bounded per collection."""
+    semaphores: Dict[str, asyncio.Semaphore] = _semaphores.get()
+    semaphore = semaphores.setdefault(collection_name, asyncio.Semaphore(VECTOR_SEARCH_MAX_CONCURRENCY_PER_COLLECTION))
+
+    await semaphore.acquire()
+    with _stats_lock:
+        _collection_stats(collection_name)["in_flight"] += 1
+
+    def release(_):
+        # Runs when the executor thread is done, not when the caller stops waiting for it,
+        # so a timed-out search keeps its slot until it really stops using the pool
+        with _stats_lock:
+            _collection_stats(collection_name)["in_flight"] -= 1
+        semaphore.release()
+
+    started = time.monotonic()
+    outcome = "searches"
+    try:
+        loop = asyncio.get_running_loop()
+        try:
+            future = loop.run_in_executor(_executor, lambda: store.similarity_search(query=query, k=k))
+        except BaseException:
+            release(None)
+            raise
+        future.add_done_callback(release)
+        # shield: a timeout or cancellation leaves the future to finish (and release) on its own
+        return await asyncio.wait_for(asyncio.shield(future), timeout=timeout)
+    except asyncio.TimeoutError:
+        outcome = "timeouts"
+        logger.warning(f"[VectorSearch] Search on '{collection_name}' timed out after {timeout:.0f}s")
+        raise
+    except Exception:
+        outcome = "errors"
+        raise
+    finally:
+        with _stats_lock:
+            stats = _collection_stats(collection_name)
+            stats[outcome] += 1
+            stats["total_seconds"] += time.monotonic() - started
+
+
+async def search_collection(
+    collection_name: str,
+    store: Any,
+    local_index: Optional[Any],
+    embeddings: Any,
+    query: str,
+    k: int,
+) -> List[Any]:
+    """Top `k` documents for `query`, from the local mirror when it is ready, else from `store` via Astra."""
+    if local_index is not None and local_index.ready:
+        try:
+            return local_index.search(await embeddings.aembed_query(query), k)
+        except Exception as e:
+            logger.warning(f"[VectorSearch] Local index search on '{collection_name}' failed ({e}); querying Astra")
+    return await search_vector_store(collection_name, store, query, k)
+
+
+def get_vector_search_stats() -> Dict[str, Dict[str, Any]]:
+    with _stats_lock:
+        report = {}
+        for name, stats in _stats.items():
+            calls = stats["searches"] + stats["timeouts"] + stats["errors"]
+            report[name] = {**stats, "avg_seconds": stats["total_seconds"] / calls if calls else 0.0}
+        return report
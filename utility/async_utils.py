@@ -0,0 +1,56 @@
+import asyncio
+import weakref
+import threading
+from typing import Callable, TypeVar
+
+T = TypeVar("T")
+
+_thread_loops = threading.local()
+
+
+def _thread_loop() -> asyncio.AbstractEventLoop:
+    # One loop per thread that lives as long as the thread, so LoopLocal clients are reused, not leaked
+    loop = getattr(_thread_loops, "loop", None)
+    if loop is None or loop.is_closed():
+        loop = _thread_loops.loop = asyncio.new_event_loop()
+    return loop
+
+
+def run_async(coro):
+    """
+    Safely run async functions in sync contexts. Without a running loop, `coro` runs on this
+    thread's long-lived loop, so repeated calls share its pooled clients.
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+
+    if loop and loop.is_running():
+        new_loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(new_loop)
+        result = new_loop.run_until_complete(coro)
+        new_loop.close()
+        return result
+    else:
+        return _thread_loop().run_until_complete(coro)
+
+
+class LoopLocal:
+    """
+    Holds one lazily built object per running event loop.
+    Async HTTP clients keep their pooled connections bound to the loop that opened
+    them, so a process-wide client has to be process-wide *per loop*.
+    """
+
+    def __init__(self, factory: Callable[[], T]):
+        self._factory = factory
+        self._values: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, T]" = weakref.WeakKeyDictionary()
+
+    def get(self) -> T:
+        loop = asyncio.get_running_loop()
+        value = self._values.get(loop)
+        if value is None:
+            value = self._factory()
+            self._values[loop] = value
+        return value
@@ -1,10 +1,16 @@
+import os
 import json
-from typing import Dict
+import hashlib
+import numpy as np
+from typing import Dict, Optional, Tuple
 from pathlib import Path
 from utility.model import ToolRegistryEntry
+from utility.Embedder import HFAPIEmbeddings, get_embedding_backend, run_async
 
 TOOL_REGISTRY: Dict[str, ToolRegistryEntry] = {}
 REGISTRY_FILE = Path("Meta/tool_registry.json")
+# Description + intent vectors for every tool, keyed by a hash of the embedded text and the embedding backend
+EMBEDDINGS_FILE = Path("Meta/tool_embeddings.npz")
 
 
 def register_tool(tool: ToolRegistryEntry):
@@ -18,6 +24,12 @@ def register_tool(tool: ToolRegistryEntry):
     TOOL_REGISTRY[tool.tool_name] = tool
     save_registry_to_file()
 
+    try:
+        refresh_tool_embeddings(TOOL_REGISTRY)
+    except Exception as e:
+        # ToolMapper recomputes missing vectors on startup, so registration still succeeds
+        print(f"Could not precompute tool embeddings: {e}")
+
 
 def save_registry_to_file():
     with open(REGISTRY_FILE, "w") as f:
@@ -29,6 +41,14 @@ def save_registry_to_file():
     print(f"Registry saved to {REGISTRY_FILE}")
 
 
+def registry_version():
+    """Changes whenever the registry file is rewritten; used to invalidate per-tool caches."""
+    try:
+        return REGISTRY_FILE.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
 def load_registry_from_file():
     if not REGISTRY_FILE.exists():
         return {}
@@ -37,6 +57,71 @@ def load_registry_from_file():
         return {name: ToolRegistryEntry(**entry) for name, entry in data.items()}
 
 
+def tool_embedding_texts(entry: ToolRegistryEntry) -> Tuple[str, str]:
+    """The (description, intents) strings that ToolMapper compares queries against."""
+    return entry.description or "", " ".join(entry.intents)
+
+
+def tool_embedding_key(entry: ToolRegistryEntry, backend_name: Optional[str] = None) -> str:
+    """Changes with the tool's text and with the embedding backend/model, so switching models re-embeds every tool."""
+    description, intents = tool_embedding_texts(entry)
+    backend_name = backend_name or get_embedding_backend().name
+    return hashlib.sha256(f"{backend_name}\n{description}\n{intents}".encode("utf-8")).hexdigest()
+
+
+def load_tool_embeddings() -> Dict[str, np.ndarray]:
+    """Returns {key: float32 array of shape (2, D)} with rows [description, intents]."""
+    if not EMBEDDINGS_FILE.exists():
+        return {}
+    with np.load(EMBEDDINGS_FILE) as data:
+        keys, vectors = data["keys"], data["vectors"]
+        return {str(key): vectors[i] for i, key in enumerate(keys)}
+
+
+def save_tool_embeddings(embeddings: Dict[str, np.ndarray]):
+    keys = sorted(embeddings)
+    vectors = np.stack([embeddings[k] for k in keys]).astype(np.float32) if keys else np.empty((0, 2, 0), dtype=np.float32)
+    tmp_file = EMBEDDINGS_FILE.with_suffix(".tmp")
+    with open(tmp_file, "wb") as f:
+        np.savez(f, keys=np.array(keys, dtype=str), vectors=vectors)
+    os.replace(tmp_file, EMBEDDINGS_FILE)
+
+
+async def arefresh_tool_embeddings(registry: Dict[str, ToolRegistryEntry], force: bool = False) -> Dict[str, np.ndarray]:
+    """
+    Embeds only the tools whose description/intents changed since the last save and
+    returns {tool_name: (2, D) float32 array} for every tool in the registry.
+    """
+    cached = {} if force else load_tool_embeddings()
+    backend_name = get_embedding_backend().name
+    live_keys = {name: tool_embedding_key(entry, backend_name) for name, entry in registry.items()}
+    stale = {name: entry for name, entry in registry.items() if live_keys[name] not in cached}
+
+    if force or stale or set(cached) - set(live_keys.values()):
+        if stale:
+            texts = [text for entry in stale.values() for text in tool_embedding_texts(entry)]
+            vectors = await HFAPIEmbeddings().embed_documents(texts)
+            for i, name in enumerate(stale):
+                cached[live_keys[name]] = np.asarray(vectors[2 * i:2 * i + 2], dtype=np.float32)
+
+            # Vectors of different sizes under one backend name (e.g. the remote model was swapped)
+            shapes = {vec.shape for key, vec in cached.items() if key in live_keys.values()}
+            if len(shapes) > 1:
+                if force:
+                    # Everything was just re-embedded, so the backend itself is inconsistent
+                    raise ValueError(f"Embedding backend '{backend_name}' returned vectors of different shapes: {sorted(shapes)}")
+                return await arefresh_tool_embeddings(registry, force=True)
+        cached = {key: vec for key, vec in cached.items() if key in live_keys.values()}
+        save_tool_embeddings(cached)
+        print(f"Tool embeddings saved to {EMBEDDINGS_FILE} ({len(stale)} recomputed)")
+
+    return {name: cached[key] for name, key in live_keys.items()}
+
+
+def refresh_tool_embeddings(registry: Dict[str, ToolRegistryEntry]) -> Dict[str, np.ndarray]:
+    return run_async(arefresh_tool_embeddings(registry))
+
+
 def generate_tool_registry_entry() -> ToolRegistryEntry:
     print("\n🔧 Register a New Tool")
     tool_name = input("Tool Name (e.g., SchemeExplainer): ").strip()